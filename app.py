@@ -1,14 +1,22 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory
+from flask import Flask, render_template, request, jsonify, redirect, url_for, send_from_directory, g
 import json
 import os
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, date as date_type
 import uuid
 from typing import Dict, List, Any, Optional
 import calendar
-from dataclasses import dataclass, asdict
+import html
+import math
+import re
+from dataclasses import dataclass, asdict, field, replace
 from copy import deepcopy
 import shutil
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from queue import Queue, Empty, Full
 from dotenv import load_dotenv  # NEW
 
 # Load environment variables from .env
@@ -26,6 +34,27 @@ NOTES_DIR = os.path.join(DATA_DIR, 'notes') # New directory for notes
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(NOTES_DIR, exist_ok=True) # Ensure notes directory exists
 
+# In-memory workspace cache (set WORKSPACE_CACHE=false to always read from SQLite)
+WORKSPACE_CACHE_ENABLED = os.getenv('WORKSPACE_CACHE', 'true').lower() not in ('0', 'false', 'no', 'off')
+
+# SQLite connection tuning, applied to every pooled connection
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-20000')),  # negative = KiB, so ~20 MB
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '8'))
+
+# Retry policy for API mutations that hit a locked database
+TRANSACTION_RETRIES = int(os.getenv('TRANSACTION_RETRIES', '3'))
+TRANSACTION_RETRY_DELAY = float(os.getenv('TRANSACTION_RETRY_DELAY', '0.05'))  # seconds, doubled per attempt
+
+# Largest date range a single calendar occurrences request may ask for
+MAX_CALENDAR_WINDOW_DAYS = 366
+
 # Data structure classes
 @dataclass
 class SelectOption:
@@ -39,7 +68,7 @@ class Property:
     name: str
     type: str  # 'text', 'date', 'select', 'number', 'status', 'rich_text'
     value: Any = None
-    options: List[SelectOption] = None  # For select/status types
+    options: List[SelectOption] = field(default_factory=list)  # For select/status types
     rich_text_content: Optional[str] = None  # For rich text type
 
 @dataclass
@@ -75,13 +104,10 @@ class Block:
 class CompletionLog:
     date: str
     completed: bool
-    timestamp: str
+    timestamp: Optional[str]  # None for days restored from a compacted month
 
-def init_database():
-    """Initialize the SQLite database with required tables"""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
+def _migration_1_base_schema(cursor):
+    """Create the original tables (all IF NOT EXISTS, so pre-migration databases are adopted as-is)"""
     # Create pages table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS pages (
@@ -184,24 +210,610 @@ def init_database():
             created_at TEXT
         )
     ''')
-    
-    conn.commit()
-    conn.close()
+
+def _migration_2_query_indexes(cursor):
+    """Secondary indexes for the lookups done by the load, save and delete helpers"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_properties_owner ON properties (owner_id, owner_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_select_options_database ON select_options (database_id, property_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_note_shares_note_path ON note_shares (note_path)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pages_parent_database ON pages (parent_database_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_databases_parent_page ON databases (parent_page_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_page_databases_database ON page_databases (database_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_database_pages_page ON database_pages (page_id)')
+
+def _migration_3_link_positions(cursor):
+    """Stable ordering column on the relationship tables, backfilled from insertion order"""
+    for table, owner_column in (('database_pages', 'database_id'), ('page_databases', 'page_id')):
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN position INTEGER')
+        cursor.execute(f'UPDATE {table} SET position = rowid')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_position ON {table} ({owner_column}, position)')
+
+def _migration_4_block_entity_id(cursor):
+    """Indexed column holding the page/database id a block refers to, backfilled from its JSON content"""
+    cursor.execute('ALTER TABLE blocks ADD COLUMN entity_id TEXT')
+    cursor.execute('SELECT id, content FROM blocks')
+    backfill = []
+    for block_id, content in cursor.fetchall():
+        try:
+            entity_id = _block_entity_id(json.loads(content))
+        except (ValueError, TypeError):
+            entity_id = None
+        backfill.append((entity_id, block_id))
+    cursor.executemany('UPDATE blocks SET entity_id = ? WHERE id = ?', backfill)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_entity ON blocks (type, entity_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_blocks_parent ON blocks (parent_id)')
+
+def _migration_5_occurrences(cursor):
+    """Materialized task occurrences, indexed by date, backfilled from existing date properties"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS occurrences (
+            page_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            start_time TEXT,
+            end_time TEXT,
+            is_repeating INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (page_id, date)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_occurrences_date ON occurrences (date)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS occurrence_series (
+            page_id TEXT PRIMARY KEY,
+            materialized_until TEXT NOT NULL -- exclusive
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_occurrence_series_until ON occurrence_series (materialized_until)')
+    dated_pages = "p.id IN (SELECT owner_id FROM properties WHERE owner_type = 'page' AND type = 'date')"
+    for page in _load_pages_by_query(cursor, dated_pages, ()):
+        refresh_page_occurrences(cursor, page)
+
+def _migration_6_task_stats(cursor):
+    """Running completion aggregates per dated task, backfilled from materialized occurrences"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_stats (
+            page_id TEXT PRIMARY KEY,
+            as_of TEXT NOT NULL,
+            expected_count INTEGER NOT NULL DEFAULT 0,
+            completed_count INTEGER NOT NULL DEFAULT 0,
+            current_streak INTEGER NOT NULL DEFAULT 0,
+            longest_streak INTEGER NOT NULL DEFAULT 0,
+            last_completed_date TEXT,
+            pending INTEGER NOT NULL DEFAULT 0,
+            month TEXT,
+            month_expected INTEGER NOT NULL DEFAULT 0,
+            month_completed INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # The completion query is frozen to this schema version: later helpers also read tables added after it
+    as_of = date_type.today().isoformat()
+    cursor.execute('SELECT DISTINCT page_id FROM occurrences')
+    for page_id in [row['page_id'] for row in cursor.fetchall()]:
+        cursor.execute('''
+            SELECT o.date, COALESCE(c.completed, 0) AS completed
+            FROM occurrences o
+            LEFT JOIN completion_logs c ON c.page_id = o.page_id AND c.date = o.date
+            WHERE o.page_id = ? AND o.date < ?
+            ORDER BY o.date
+        ''', (page_id, _next_day(as_of)))
+        stats = _empty_task_stats(as_of)
+        _advance_task_stats(stats, [(row['date'], row['completed']) for row in cursor.fetchall()], as_of)
+        if stats['expected_count']:
+            _store_task_stats(cursor, page_id, stats)
+
+def _migration_7_completion_months(cursor):
+    """Compacted completion history: one bitmap of completed days per page and month"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS completion_months (
+            page_id TEXT NOT NULL,
+            month TEXT NOT NULL, -- YYYY-MM
+            completed_days INTEGER NOT NULL DEFAULT 0, -- bit d-1 set when day d was completed
+            PRIMARY KEY (page_id, month)
+        )
+    ''')
+
+def _migration_8_hierarchy_closure(cursor):
+    """Ancestor/descendant pairs of the page/database tree, backfilled from the parent columns"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS hierarchy_closure (
+            ancestor_id TEXT NOT NULL,
+            ancestor_type TEXT NOT NULL, -- 'page' or 'database'
+            descendant_id TEXT NOT NULL,
+            depth INTEGER NOT NULL, -- 0 for the node itself
+            PRIMARY KEY (descendant_id, ancestor_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_hierarchy_closure_ancestor ON hierarchy_closure (ancestor_id, depth)')
+
+    parents = {}
+    cursor.execute('SELECT id, parent_database_id FROM pages')
+    for row in cursor.fetchall():
+        parents[row['id']] = ('page', row['parent_database_id'])
+    cursor.execute('SELECT id, parent_page_id FROM databases')
+    for row in cursor.fetchall():
+        parents[row['id']] = ('database', row['parent_page_id'])
+
+    rows = []
+    for node_id in parents:
+        ancestor_id, depth = node_id, 0
+        # Stop at a missing parent, as the old breadcrumb walk did, and at cycles
+        while ancestor_id in parents and depth <= len(parents):
+            rows.append((ancestor_id, parents[ancestor_id][0], node_id, depth))
+            ancestor_id, depth = parents[ancestor_id][1], depth + 1
+    cursor.executemany('INSERT OR IGNORE INTO hierarchy_closure VALUES (?, ?, ?, ?)', rows)
+
+def _migration_9_navigation_indexes(cursor):
+    """Index for the home page's most-recently-updated list"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_pages_updated_at ON pages (updated_at)')
+
+def _migration_10_typed_property_columns(cursor):
+    """Typed shadow columns of property values, indexed per database for filtering and sorting in SQL"""
+    for column in ('database_id TEXT', 'num_value REAL', 'date_start TEXT', 'date_end TEXT', 'option_id TEXT'):
+        cursor.execute(f'ALTER TABLE properties ADD COLUMN {column}')
+    cursor.execute('''
+        UPDATE properties SET database_id = (SELECT NULLIF(parent_database_id, '') FROM pages WHERE pages.id = properties.owner_id)
+        WHERE owner_type = 'page'
+    ''')
+    cursor.execute('SELECT rowid, type, value FROM properties WHERE value IS NOT NULL')
+    rows = [_typed_property_columns(row['type'], row['value']) + (row['rowid'],) for row in cursor.fetchall()]
+    cursor.executemany('UPDATE properties SET num_value = ?, date_start = ?, date_end = ?, option_id = ? WHERE rowid = ?', rows)
+    for column in ('num_value', 'date_start', 'option_id'):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_properties_{column} ON properties (database_id, id, {column})')
+
+def _migration_11_search_index(cursor):
+    """FTS5 index over page titles, text properties and notes, built from what exists now"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_documents (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL, -- 'page' or 'note'
+            ref TEXT NOT NULL, -- page id or note path relative to NOTES_DIR
+            UNIQUE (kind, ref)
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+        )
+    ''')
+    rebuild_search_index(cursor)
+
+# Ordered schema migrations; the database's PRAGMA user_version records how many have run
+SCHEMA_MIGRATIONS = [
+    _migration_1_base_schema,
+    _migration_2_query_indexes,
+    _migration_3_link_positions,
+    _migration_4_block_entity_id,
+    _migration_5_occurrences,
+    _migration_6_task_stats,
+    _migration_7_completion_months,
+    _migration_8_hierarchy_closure,
+    _migration_9_navigation_indexes,
+    _migration_10_typed_property_columns,
+    _migration_11_search_index,
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+def init_database():
+    """Bring the SQLite schema up to SCHEMA_VERSION, doing nothing if it is already current"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    current_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    if current_version >= SCHEMA_VERSION:
+        return
+
+    for version, migration in enumerate(SCHEMA_MIGRATIONS[current_version:], start=current_version + 1):
+        # Each migration and its version bump commit together
+        cursor.execute('BEGIN')
+        try:
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+class ConnectionPool:
+    """
+    Keeps idle SQLite connections around so they are not reopened (and re-tuned)
+    for every helper call. Each connection is configured with SQLITE_PRAGMAS once.
+    """
+    def __init__(self, path: str, pragmas: Dict[str, Any], max_idle: int = 8):
+        self.path = path
+        self.pragmas = pragmas
+        self._idle: Queue = Queue(maxsize=max(max_idle, 1))
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between threads through the pool, but are only
+        # ever used by the thread that has them checked out.
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            return self._connect()
+
+    def release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except Full:
+            conn.close()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                return
+
+connection_pool = ConnectionPool(DATABASE_FILE, SQLITE_PRAGMAS, max_idle=SQLITE_POOL_SIZE)
+_thread_connection = threading.local()
 
 def get_db_connection():
-    """Get a database connection"""
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
+    """
+    Get the database connection checked out by the current thread.
+    The same connection is reused for every helper call until
+    release_db_connection() hands it back to the pool at the end of the request.
+    """
+    conn = getattr(_thread_connection, 'conn', None)
+    if conn is None:
+        conn = connection_pool.acquire()
+        _thread_connection.conn = conn
     return conn
 
+def release_db_connection():
+    """Return the current thread's connection to the pool, discarding uncommitted work"""
+    conn = getattr(_thread_connection, 'conn', None)
+    if conn is not None:
+        _thread_connection.conn = None
+        connection_pool.release(conn)
+
+@app.teardown_request
+def _release_db_connection(exc=None):
+    release_db_connection()
+
+# --- Unit of Work ---
+
+def _in_unit_of_work() -> bool:
+    return getattr(_thread_connection, 'uow_depth', 0) > 0
+
+def _has_uncommitted_writes() -> bool:
+    """Whether the current unit of work has written rows the workspace cache does not reflect yet"""
+    return _in_unit_of_work() and bool(_thread_connection.after_commit)
+
+def _commit(conn: sqlite3.Connection):
+    """Commit now, unless a unit_of_work() is open; it then commits once when it ends"""
+    if not _in_unit_of_work():
+        _publish_commit(conn)
+
+def _after_commit(callback, *args):
+    """Queue a cache update for the next commit of this thread's connection; call it before _commit()"""
+    if getattr(_thread_connection, 'after_commit', None) is None:
+        _thread_connection.after_commit = []
+    _thread_connection.after_commit.append((callback, args))
+
+def _publish_commit(conn: sqlite3.Connection):
+    """Commit and apply the queued cache updates under the cache lock, so no reader sees one without the other"""
+    callbacks, _thread_connection.after_commit = getattr(_thread_connection, 'after_commit', None) or [], []
+    workspace_cache.commit(conn, callbacks)
+
+@contextmanager
+def unit_of_work():
+    """
+    Run every helper call inside the block on one connection, in one transaction,
+    with a single commit. Nested blocks join the outermost one. Cache write-through
+    is applied together with the commit, so a rollback leaves the cache untouched;
+    handlers edit copies, never the cached objects themselves.
+    """
+    if _in_unit_of_work():
+        _thread_connection.uow_depth += 1
+        try:
+            yield get_db_connection()
+        finally:
+            _thread_connection.uow_depth -= 1
+        return
+
+    conn = get_db_connection()
+    # Take the write lock up front so busy errors surface here, before any work is done
+    conn.execute('BEGIN IMMEDIATE')
+    _thread_connection.uow_depth = 1
+    _thread_connection.after_commit = []
+    try:
+        yield conn
+        _publish_commit(conn)
+    except BaseException:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        _thread_connection.uow_depth = 0
+        _thread_connection.after_commit = []
+
+def _is_busy_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return 'database is locked' in message or 'database is busy' in message
+
+def atomic(func):
+    """Route decorator: run the handler in a unit_of_work(), retrying it when SQLite reports busy"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(TRANSACTION_RETRIES + 1):
+            try:
+                with unit_of_work():
+                    return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_busy_error(e) or attempt == TRANSACTION_RETRIES:
+                    raise
+                time.sleep(TRANSACTION_RETRY_DELAY * (2 ** attempt))
+    return wrapper
+
 class NotionData:
     def __init__(self):
         self.blocks: Dict[str, Block] = {}
         self.pages: Dict[str, Page] = {}
         self.databases: Dict[str, Database] = {}
         self.completion_logs: Dict[str, List[CompletionLog]] = {}
+        self.completion_months: Dict[str, Dict[str, int]] = {}  # page_id -> {YYYY-MM: completed-day bitmap}
+
+class WorkspaceCache:
+    """
+    Process-wide cache of the NotionData graph.
+    The save_*/link/delete helpers write through to it as they commit (see commit()),
+    so read routes can be served without touching SQLite.
+    """
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._data: Optional[NotionData] = None
+        self._lock = threading.RLock()
+
+    def get(self) -> NotionData:
+        # Inside a unit of work that already wrote, read through the open transaction instead
+        if not self.enabled or _has_uncommitted_writes():
+            with self._lock:
+                self.misses += 1
+            return _load_data_from_db()
+        with self._lock:
+            if self._data is None:
+                self.misses += 1
+                self._data = _load_data_from_db()
+            else:
+                self.hits += 1
+            return self._data
+
+    def snapshot(self) -> Optional[NotionData]:
+        """The cached workspace for the scoped loaders, loaded on first use; None means read SQLite instead"""
+        if not self.enabled or _has_uncommitted_writes():
+            return None
+        return self.get()
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    def commit(self, conn: sqlite3.Connection, updates: List[tuple]):
+        """Commit conn and apply its (callback, args) write-through updates before any reader can look again"""
+        with self._lock:
+            conn.commit()
+            for callback, args in updates:
+                callback(*args)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'loaded': self._data is not None,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    # Write-through updates, applied by commit() together with the SQLite commit.
+    # Child lists only change through add_link/remove_link, so put_* keep the cached ones.
+    # Readers may be serializing cached objects at any time, so updates swap in new
+    # objects and lists instead of changing the cached ones in place.
+
+    def put_page(self, page: Page):
+        with self._lock:
+            if self._data is not None:
+                cached = self._data.pages.get(page.id)
+                page = deepcopy(page)
+                if cached is not None:
+                    page.databases = cached.databases
+                self._data.pages[page.id] = page
+
+    def put_page_property(self, page_id: str, prop: Property, updated_at: str):
+        with self._lock:
+            page = self._data.pages.get(page_id) if self._data is not None else None
+            if page is not None:
+                self._data.pages[page_id] = replace(
+                    page, properties={**page.properties, prop.id: deepcopy(prop)}, updated_at=updated_at)
+
+    def put_database(self, database: Database):
+        with self._lock:
+            if self._data is not None:
+                cached = self._data.databases.get(database.id)
+                database = deepcopy(database)
+                if cached is not None:
+                    database.pages = cached.pages
+                self._data.databases[database.id] = database
+
+    def put_block(self, block: Block):
+        with self._lock:
+            if self._data is not None:
+                self._data.blocks[block.id] = deepcopy(block)
+
+    def put_completion_log(self, page_id: str, log: CompletionLog):
+        with self._lock:
+            if self._data is None:
+                return
+            logs = [existing for existing in self._data.completion_logs.get(page_id, []) if existing.date != log.date]
+            self._data.completion_logs[page_id] = sorted(logs + [deepcopy(log)], key=lambda entry: entry.date)
+
+    def add_link(self, owner_type: str, owner_id: str, child_id: str):
+        with self._lock:
+            children = self._child_ids(owner_type, owner_id)
+            if children is not None and child_id not in children:
+                self._set_child_ids(owner_type, owner_id, children + [child_id])
+
+    def remove_link(self, owner_type: str, owner_id: str, child_id: str):
+        with self._lock:
+            children = self._child_ids(owner_type, owner_id)
+            if children is not None and child_id in children:
+                self._set_child_ids(owner_type, owner_id, [c for c in children if c != child_id])
+
+    def _child_ids(self, owner_type: str, owner_id: str) -> Optional[List[str]]:
+        """The cached child id list of a page ('page') or database ('database'), or None if it is not cached"""
+        if self._data is None:
+            return None
+        if owner_type == 'page':
+            owner = self._data.pages.get(owner_id)
+            return None if owner is None else owner.databases or []
+        owner = self._data.databases.get(owner_id)
+        return None if owner is None else owner.pages or []
+
+    def _set_child_ids(self, owner_type: str, owner_id: str, child_ids: List[str]):
+        if owner_type == 'page':
+            self._data.pages[owner_id] = replace(self._data.pages[owner_id], databases=child_ids)
+        else:
+            self._data.databases[owner_id] = replace(self._data.databases[owner_id], pages=child_ids)
+
+    def remove_subtree(self, page_ids: List[str], database_ids: List[str]):
+        """Drop many pages and databases in one pass over the cached graph"""
+        with self._lock:
+            data = self._data
+            if data is None:
+                return
+            page_ids, database_ids = set(page_ids), set(database_ids)
+            # Rebuilt maps, so a reader iterating the old ones never sees them change size
+            data.pages = {
+                page_id: page if not page.databases or database_ids.isdisjoint(page.databases)
+                else replace(page, databases=[d for d in page.databases if d not in database_ids])
+                for page_id, page in data.pages.items() if page_id not in page_ids
+            }
+            data.databases = {
+                database_id: database if not database.pages or page_ids.isdisjoint(database.pages)
+                else replace(database, pages=[p for p in database.pages if p not in page_ids])
+                for database_id, database in data.databases.items() if database_id not in database_ids
+            }
+            data.completion_logs = {k: v for k, v in data.completion_logs.items() if k not in page_ids}
+            data.completion_months = {k: v for k, v in data.completion_months.items() if k not in page_ids}
+            data.blocks = {
+                block_id: block for block_id, block in data.blocks.items()
+                if not ((block.type == 'page' and block.content.get('page_id') in page_ids)
+                        or (block.type == 'database' and block.content.get('database_id') in database_ids))
+            }
+
+workspace_cache = WorkspaceCache(enabled=WORKSPACE_CACHE_ENABLED)
 
 def load_data():
+    """Return the workspace, served from the in-memory cache when enabled"""
+    return workspace_cache.get()
+
+def _page_from_row(row) -> Page:
+    return Page(
+        id=row['id'],
+        title=row['title'],
+        properties={},
+        databases=[],
+        parent_database_id=row['parent_database_id'],
+        created_at=row['created_at'],
+        updated_at=row['updated_at']
+    )
+
+def _database_from_row(row) -> Database:
+    return Database(
+        id=row['id'],
+        name=row['name'],
+        properties={},
+        pages=[],
+        parent_page_id=row['parent_page_id'],
+        created_at=row['created_at'],
+        updated_at=row['updated_at'],
+        color=row['color'] if 'color' in row.keys() and row['color'] else '#3b82f6'
+    )
+
+def _iso_day(value) -> Optional[str]:
+    """The YYYY-MM-DD prefix of an ISO date or datetime string, or None"""
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    try:
+        return date_type.fromisoformat(value[:10]).isoformat()
+    except ValueError:
+        return None
+
+def _typed_property_columns(property_type: str, stored_value: Optional[str]) -> tuple:
+    """
+    (num_value, date_start, date_end, option_id) for a JSON-encoded property value.
+    Numbers and dates are recognized by shape, so they stay queryable after a property's type changes;
+    option ids are only taken from select and status rows.
+    """
+    value = json.loads(stored_value) if stored_value else None
+    num_value = date_start = date_end = option_id = None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        num_value = float(value)
+    elif isinstance(value, str) and value.strip():
+        try:
+            num_value = float(value)
+        except ValueError:
+            pass
+        if num_value is not None and not math.isfinite(num_value):
+            num_value = None
+    if isinstance(value, dict):
+        date_start, date_end = _iso_day(value.get('start_date')), _iso_day(value.get('end_date'))
+    else:
+        date_start = _iso_day(value)
+    if property_type in ('select', 'status') and isinstance(value, str):
+        option_id = value
+    return num_value, date_start, date_end or date_start, option_id
+
+def _property_from_row(row, options: List[SelectOption]) -> Property:
+    return Property(
+        id=row['id'],
+        name=row['name'],
+        type=row['type'],
+        value=json.loads(row['value']) if row['value'] and row['value'] != 'null' else None,
+        options=options,
+        rich_text_content=row['rich_text_content']
+    )
+
+def _block_from_row(row) -> Block:
+    return Block(
+        id=row['id'],
+        type=row['type'],
+        content=json.loads(row['content']),
+        parent_id=row['parent_id'],
+        children=json.loads(row['children']) if row['children'] else []
+    )
+
+def _completion_log_from_row(row) -> CompletionLog:
+    return CompletionLog(
+        date=row['date'],
+        completed=bool(row['completed']),
+        timestamp=row['timestamp']
+    )
+
+def _expand_completion_month(month: str, completed_days: int) -> List[CompletionLog]:
+    """The completed days recorded in a compacted month bitmap"""
+    return [CompletionLog(date=f'{month}-{day:02d}', completed=True, timestamp=None)
+            for day in range(1, 32) if completed_days >> (day - 1) & 1]
+
+def _merge_completion_logs(logs: List[CompletionLog], months: Dict[str, int]) -> List[CompletionLog]:
+    """Detailed logs plus the days of compacted months; a detailed log wins over its day's bit"""
+    if not months:
+        return logs
+    merged = {log.date: log for month, completed_days in months.items()
+              for log in _expand_completion_month(month, completed_days)}
+    merged.update((log.date, log) for log in logs)
+    return sorted(merged.values(), key=lambda log: log.date)
+
+def _load_data_from_db():
     """Load all data from SQLite database"""
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -211,48 +823,29 @@ def load_data():
     # Load pages
     cursor.execute('SELECT * FROM pages')
     for row in cursor.fetchall():
-        page = Page(
-            id=row['id'],
-            title=row['title'],
-            properties={},
-            databases=[],
-            parent_database_id=row['parent_database_id'],
-            created_at=row['created_at'],
-            updated_at=row['updated_at']
-        )
-        data.pages[row['id']] = page
+        data.pages[row['id']] = _page_from_row(row)
     
     # Load databases
     cursor.execute('SELECT * FROM databases')
     for row in cursor.fetchall():
-        database = Database(
-            id=row['id'],
-            name=row['name'],
-            properties={},
-            pages=[],
-            parent_page_id=row['parent_page_id'],
-            created_at=row['created_at'],
-            updated_at=row['updated_at'],
-            color=row['color'] if 'color' in row.keys() and row['color'] else '#3b82f6'
+        data.databases[row['id']] = _database_from_row(row)
+    
+    # Load all select options in one query, grouped by (property_id, database_id)
+    select_options: Dict[tuple, List[SelectOption]] = {}
+    cursor.execute('SELECT * FROM select_options')
+    for opt in cursor.fetchall():
+        select_options.setdefault((opt['property_id'], opt['database_id']), []).append(
+            SelectOption(id=opt['id'], name=opt['name'], color=opt['color'])
         )
-        data.databases[row['id']] = database
-    
-    # Load properties and their select options
+
+    # Load properties and attach their select options
     cursor.execute('SELECT * FROM properties')
     for row in cursor.fetchall():
         options = []
         if row['type'] == 'select':
-            cursor.execute('SELECT * FROM select_options WHERE property_id = ? AND database_id = ?', (row['id'], row['owner_id']))
-            options = [SelectOption(id=opt['id'], name=opt['name'], color=opt['color']) for opt in cursor.fetchall()]
-
-        prop = Property(
-            id=row['id'],
-            name=row['name'],
-            type=row['type'],
-            value=json.loads(row['value']) if row['value'] and row['value'] != 'null' else None,
-            options=options,
-            rich_text_content=row['rich_text_content']
-        )
+            options = select_options.get((row['id'], row['owner_id']), [])
+
+        prop = _property_from_row(row, options)
         
         if row['owner_type'] == 'page' and row['owner_id'] in data.pages:
             data.pages[row['owner_id']].properties[row['id']] = prop
@@ -262,23 +855,16 @@ def load_data():
     # Load blocks
     cursor.execute('SELECT * FROM blocks')
     for row in cursor.fetchall():
-        block = Block(
-            id=row['id'],
-            type=row['type'],
-            content=json.loads(row['content']),
-            parent_id=row['parent_id'],
-            children=json.loads(row['children']) if row['children'] else []
-        )
-        data.blocks[row['id']] = block
+        data.blocks[row['id']] = _block_from_row(row)
     
     # Load page-database relationships
-    cursor.execute('SELECT * FROM page_databases')
+    cursor.execute('SELECT * FROM page_databases ORDER BY page_id, position')
     for row in cursor.fetchall():
         if row['page_id'] in data.pages:
             data.pages[row['page_id']].databases.append(row['database_id'])
     
     # Load database-page relationships
-    cursor.execute('SELECT * FROM database_pages')
+    cursor.execute('SELECT * FROM database_pages ORDER BY database_id, position')
     for row in cursor.fetchall():
         if row['database_id'] in data.databases:
             data.databases[row['database_id']].pages.append(row['page_id'])
@@ -286,134 +872,547 @@ def load_data():
     # Load completion logs
     cursor.execute('SELECT * FROM completion_logs')
     for row in cursor.fetchall():
-        if row['page_id'] not in data.completion_logs:
-            data.completion_logs[row['page_id']] = []
-        
-        log = CompletionLog(
-            date=row['date'],
-            completed=bool(row['completed']),
-            timestamp=row['timestamp']
-        )
-        data.completion_logs[row['page_id']].append(log)
-    
-    conn.close()
-    
-    # Initialize default page if no data exists
-    if not data.pages and not data.databases:
-        _create_default_page(data)
+        data.completion_logs.setdefault(row['page_id'], []).append(_completion_log_from_row(row))
+    cursor.execute('SELECT * FROM completion_months')
+    for row in cursor.fetchall():
+        data.completion_months.setdefault(row['page_id'], {})[row['month']] = row['completed_days']
     
     return data
 
-def _create_default_page(data):
-    """Create default page if database is empty"""
+def create_default_page():
+    """Create the welcome page and its block if the workspace has no pages or databases"""
+    with unit_of_work() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM pages) OR EXISTS (SELECT 1 FROM databases)')
+        if cursor.fetchone()[0]:
+            return
+        
+        current_time = datetime.now().isoformat()
+        page = Page(
+            id=str(uuid.uuid4()),
+            title="Welcome to Your Workspace",
+            properties={},
+            databases=[],
+            created_at=current_time,
+            updated_at=current_time
+        )
+        save_page(page)
+        save_block(Block(
+            id=str(uuid.uuid4()),
+            type='page',
+            content={'page_id': page.id},
+            children=[]
+        ))
+
+# --- Scoped loaders ---
+# Single-entity reads. With the workspace cache enabled they answer from it (the
+# first read loads it); otherwise they query only the rows they need.
+
+def page_exists(page_id: str) -> bool:
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return page_id in data.pages
+    cursor = get_db_connection().cursor()
+    cursor.execute('SELECT 1 FROM pages WHERE id = ?', (page_id,))
+    return cursor.fetchone() is not None
+
+def missing_page_ids(page_ids: List[str]) -> List[str]:
+    """The ids in page_ids that do not name an existing page"""
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return [page_id for page_id in page_ids if page_id not in data.pages]
+    cursor = get_db_connection().cursor()
+    found = set()
+    for i in range(0, len(page_ids), 500):
+        chunk = page_ids[i:i + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f'SELECT id FROM pages WHERE id IN ({placeholders})', chunk)
+        found.update(row['id'] for row in cursor.fetchall())
+    return [page_id for page_id in page_ids if page_id not in found]
+
+def database_exists(database_id: str) -> bool:
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return database_id in data.databases
+    cursor = get_db_connection().cursor()
+    cursor.execute('SELECT 1 FROM databases WHERE id = ?', (database_id,))
+    return cursor.fetchone() is not None
+
+def _load_pages_by_query(cursor, where: str, params: tuple) -> List[Page]:
+    """Pages matching a WHERE clause on the pages table (aliased p), with properties and child databases"""
+    cursor.execute(f'SELECT p.* FROM pages p WHERE {where}', params)
+    pages = {row['id']: _page_from_row(row) for row in cursor.fetchall()}
+    if not pages:
+        return []
+
+    cursor.execute(f'''
+        SELECT pr.* FROM properties pr
+        WHERE pr.owner_type = 'page' AND pr.owner_id IN (SELECT p.id FROM pages p WHERE {where})
+    ''', params)
+    for row in cursor.fetchall():
+        pages[row['owner_id']].properties[row['id']] = _property_from_row(row, [])
+
+    cursor.execute(f'''
+        SELECT pd.page_id, pd.database_id FROM page_databases pd
+        WHERE pd.page_id IN (SELECT p.id FROM pages p WHERE {where})
+        ORDER BY pd.page_id, pd.position
+    ''', params)
+    for row in cursor.fetchall():
+        pages[row['page_id']].databases.append(row['database_id'])
+
+    return list(pages.values())
+
+def load_page(page_id: str) -> Optional[Page]:
+    """A single page with its properties and child database ids (shared with the cache: copy before mutating)"""
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return data.pages.get(page_id)
+    pages = _load_pages_by_query(get_db_connection().cursor(), 'p.id = ?', (page_id,))
+    return pages[0] if pages else None
+
+def load_pages(page_ids: List[str]) -> Dict[str, Page]:
+    """Several pages by id, with properties and child database ids"""
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return {page_id: data.pages[page_id] for page_id in page_ids if page_id in data.pages}
+    cursor = get_db_connection().cursor()
+    pages = {}
+    for i in range(0, len(page_ids), 500):
+        chunk = page_ids[i:i + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        for page in _load_pages_by_query(cursor, f'p.id IN ({placeholders})', tuple(chunk)):
+            pages[page.id] = page
+    return pages
+
+def load_completion_logs(page_id: str) -> List[CompletionLog]:
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return _merge_completion_logs(data.completion_logs.get(page_id, []), data.completion_months.get(page_id, {}))
+    cursor = get_db_connection().cursor()
+    cursor.execute('SELECT * FROM completion_logs WHERE page_id = ?', (page_id,))
+    logs = [_completion_log_from_row(row) for row in cursor.fetchall()]
+    cursor.execute('SELECT month, completed_days FROM completion_months WHERE page_id = ?', (page_id,))
+    return _merge_completion_logs(logs, {row['month']: row['completed_days'] for row in cursor.fetchall()})
+
+def load_completion_logs_range(page_ids: List[str], start: str, end: str) -> Dict[str, List[CompletionLog]]:
+    """Completion logs of several pages with start <= date < end, read through the (page_id, date) key"""
+    last_month = (date_type.fromisoformat(end) - timedelta(days=1)).isoformat()[:7]
+    data = workspace_cache.snapshot()
+    if data is not None:
+        logs = {page_id: [log for log in data.completion_logs.get(page_id, []) if start <= log.date < end]
+                for page_id in page_ids}
+        months = {page_id: {month: bits for month, bits in data.completion_months.get(page_id, {}).items()
+                            if start[:7] <= month <= last_month}
+                  for page_id in page_ids}
+    else:
+        cursor = get_db_connection().cursor()
+        logs = {page_id: [] for page_id in page_ids}
+        months = {page_id: {} for page_id in page_ids}
+        for i in range(0, len(page_ids), 500):
+            chunk = page_ids[i:i + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT * FROM completion_logs
+                WHERE page_id IN ({placeholders}) AND date >= ? AND date < ?
+            ''', (*chunk, start, end))
+            for row in cursor.fetchall():
+                logs[row['page_id']].append(_completion_log_from_row(row))
+            cursor.execute(f'''
+                SELECT * FROM completion_months
+                WHERE page_id IN ({placeholders}) AND month >= ? AND month <= ?
+            ''', (*chunk, start[:7], last_month))
+            for row in cursor.fetchall():
+                months[row['page_id']][row['month']] = row['completed_days']
+    return {page_id: [log for log in _merge_completion_logs(sorted(logs[page_id], key=lambda log: log.date), months[page_id])
+                      if start <= log.date < end]
+            for page_id in page_ids}
+
+def load_property_definition(page_id: str, property_id: str) -> tuple:
+    """(page exists, definition of property_id in the page's parent database or None)"""
+    data = workspace_cache.snapshot()
+    if data is not None:
+        page = data.pages.get(page_id)
+        if page is None:
+            return False, None
+        database = data.databases.get(page.parent_database_id)
+        return True, database.properties.get(property_id) if database else None
+
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT p.parent_database_id, d.name, d.type FROM pages p
+        LEFT JOIN properties d ON d.owner_type = 'database' AND d.owner_id = p.parent_database_id AND d.id = ?
+        WHERE p.id = ?
+    ''', (property_id, page_id))
+    row = cursor.fetchone()
+    if row is None:
+        return False, None
+    if row['type'] is None:
+        return True, None
+    cursor.execute('SELECT * FROM select_options WHERE database_id = ? AND property_id = ?',
+                   (row['parent_database_id'], property_id))
+    options = [SelectOption(id=opt['id'], name=opt['name'], color=opt['color']) for opt in cursor.fetchall()]
+    return True, Property(id=property_id, name=row['name'], type=row['type'], options=options)
+
+# Sidebar tree levels are served in pages of this many children
+TREE_PAGE_SIZE = 50
+MAX_TREE_PAGE_SIZE = 200
+
+_PAGE_CHILD_COUNT = '''(SELECT COUNT(*) FROM page_databases pd JOIN databases cd ON cd.id = pd.database_id
+                        WHERE pd.page_id = p.id)'''
+_DATABASE_CHILD_COUNT = '''(SELECT COUNT(*) FROM database_pages dp JOIN pages cp ON cp.id = dp.page_id
+                            WHERE dp.database_id = d.id)'''
+
+def load_tree_children(parent_type: str, parent_id: Optional[str], after: int, limit: int) -> tuple:
+    """
+    One level of the page/database tree, in sidebar order, as ({id, type, title, child_count}, next_cursor).
+    parent_type 'root' lists top-level pages, 'page' a page's databases and 'database' a database's pages.
+    after is the cursor returned with the previous batch (0 for the first).
+    """
+    cursor = get_db_connection().cursor()
+    if parent_type == 'root':
+        cursor.execute(f'''
+            SELECT p.rowid AS position, p.id, p.title, 'page' AS type, {_PAGE_CHILD_COUNT} AS child_count
+            FROM pages p
+            WHERE (p.parent_database_id IS NULL OR p.parent_database_id = '') AND p.rowid > ?
+            ORDER BY p.rowid LIMIT ?
+        ''', (after, limit + 1))
+    elif parent_type == 'page':
+        cursor.execute(f'''
+            SELECT l.position, d.id, d.name AS title, 'database' AS type, {_DATABASE_CHILD_COUNT} AS child_count
+            FROM page_databases l JOIN databases d ON d.id = l.database_id
+            WHERE l.page_id = ? AND l.position > ?
+            ORDER BY l.position LIMIT ?
+        ''', (parent_id, after, limit + 1))
+    else:
+        cursor.execute(f'''
+            SELECT l.position, p.id, p.title, 'page' AS type, {_PAGE_CHILD_COUNT} AS child_count
+            FROM database_pages l JOIN pages p ON p.id = l.page_id
+            WHERE l.database_id = ? AND l.position > ?
+            ORDER BY l.position LIMIT ?
+        ''', (parent_id, after, limit + 1))
+    rows = cursor.fetchall()
+    items = [{'id': row['id'], 'type': row['type'], 'title': row['title'], 'child_count': row['child_count']}
+             for row in rows[:limit]]
+    next_cursor = rows[limit - 1]['position'] if len(rows) > limit else None
+    return items, next_cursor
+
+def load_recent_pages(limit: int) -> List[Page]:
+    """The most recently updated pages, without their properties"""
+    cursor = get_db_connection().cursor()
+    cursor.execute('SELECT * FROM pages ORDER BY updated_at DESC LIMIT ?', (limit,))
+    return [_page_from_row(row) for row in cursor.fetchall()]
+
+def load_database_filters() -> List[Dict[str, Any]]:
+    """Every database with its color and the database its parent page belongs to, for the calendar filter tree"""
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT d.id, d.name, d.color, p.parent_database_id FROM databases d
+        LEFT JOIN pages p ON p.id = d.parent_page_id
+        ORDER BY d.rowid
+    ''')
+    return [{'id': row['id'], 'name': row['name'], 'color': row['color'] or '#3b82f6',
+             'parent_database_id': row['parent_database_id']} for row in cursor.fetchall()]
+
+def load_hierarchy(node_id: str) -> List[Dict[str, str]]:
+    """Breadcrumb from the root down to a page or database: [{'id', 'title', 'type'}, ...]"""
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT h.ancestor_id AS id, h.ancestor_type AS type, COALESCE(p.title, d.name) AS title
+        FROM hierarchy_closure h
+        LEFT JOIN pages p ON h.ancestor_type = 'page' AND p.id = h.ancestor_id
+        LEFT JOIN databases d ON h.ancestor_type = 'database' AND d.id = h.ancestor_id
+        WHERE h.descendant_id = ?
+        ORDER BY h.depth DESC
+    ''', (node_id,))
+    return [{'id': row['id'], 'title': row['title'], 'type': row['type']} for row in cursor.fetchall()]
+
+def load_database(database_id: str) -> Optional[Database]:
+    """A single database with its property definitions, select options and page ids (shared with the cache: copy before mutating)"""
+    data = workspace_cache.snapshot()
+    if data is not None:
+        return data.databases.get(database_id)
+
+    cursor = get_db_connection().cursor()
+    cursor.execute('SELECT * FROM databases WHERE id = ?', (database_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    database = _database_from_row(row)
+
+    select_options: Dict[str, List[SelectOption]] = {}
+    cursor.execute('SELECT * FROM select_options WHERE database_id = ?', (database_id,))
+    for opt in cursor.fetchall():
+        select_options.setdefault(opt['property_id'], []).append(
+            SelectOption(id=opt['id'], name=opt['name'], color=opt['color'])
+        )
+
+    cursor.execute("SELECT * FROM properties WHERE owner_id = ? AND owner_type = 'database'", (database_id,))
+    for row in cursor.fetchall():
+        options = select_options.get(row['id'], []) if row['type'] == 'select' else []
+        database.properties[row['id']] = _property_from_row(row, options)
+
+    cursor.execute('SELECT page_id FROM database_pages WHERE database_id = ? ORDER BY position', (database_id,))
+    database.pages = [row['page_id'] for row in cursor.fetchall()]
+    return database
+
+def load_database_with_pages(database_id: str):
+    """A database and its pages in row order, or (None, []) if it does not exist"""
+    database = load_database(database_id)
+    if database is None:
+        return None, []
+
+    data = workspace_cache.snapshot()
+    if data is not None:
+        pages = [data.pages[page_id] for page_id in database.pages if page_id in data.pages]
+    else:
+        loaded = _load_pages_by_query(
+            get_db_connection().cursor(),
+            'p.id IN (SELECT page_id FROM database_pages WHERE database_id = ?)',
+            (database_id,)
+        )
+        by_id = {page.id: page for page in loaded}
+        pages = [by_id[page_id] for page_id in database.pages if page_id in by_id]
+    return database, pages
+
+def _sync_properties(cursor, owner_id: str, owner_type: str, properties: Dict[str, Property],
+                     database_id: Optional[str] = None) -> set:
+    """
+    Write only the property rows of an owner that differ from what is stored; returns the types touched.
+    database_id is the parent database of a page, recorded with its values for the per-database indexes.
+    """
+    cursor.execute('''
+        SELECT id, name, type, value, rich_text_content, database_id FROM properties
+        WHERE owner_id = ? AND owner_type = ?
+    ''', (owner_id, owner_type))
+    stored = {row['id']: (row['name'], row['type'], row['value'], row['rich_text_content'], row['database_id'])
+              for row in cursor.fetchall()}
+
+    wanted = {}
+    for prop in properties.values():
+        wanted[prop.id] = (prop.name, prop.type,
+                           json.dumps(prop.value) if prop.value is not None else None,
+                           prop.rich_text_content, database_id or None)
+
+    removed = [(prop_id, owner_id) for prop_id in stored if prop_id not in wanted]
+    changed = [(prop_id, owner_id, owner_type) + row + _typed_property_columns(row[1], row[2])
+               for prop_id, row in wanted.items() if stored.get(prop_id) != row]
+
+    if removed:
+        cursor.executemany('DELETE FROM properties WHERE id = ? AND owner_id = ?', removed)
+    if changed:
+        cursor.executemany('''
+            INSERT INTO properties (id, owner_id, owner_type, name, type, value, rich_text_content, database_id,
+                                    num_value, date_start, date_end, option_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (id, owner_id) DO UPDATE SET
+                owner_type = excluded.owner_type,
+                name = excluded.name,
+                type = excluded.type,
+                value = excluded.value,
+                rich_text_content = excluded.rich_text_content,
+                database_id = excluded.database_id,
+                num_value = excluded.num_value,
+                date_start = excluded.date_start,
+                date_end = excluded.date_end,
+                option_id = excluded.option_id
+        ''', changed)
+
+    return {stored[prop_id][1] for prop_id, _ in removed} | {row[4] for row in changed}
+
+def _sync_select_options(cursor, database: Database):
+    """Write only the select options of a database that differ from what is stored"""
+    cursor.execute('SELECT id, property_id, name, color FROM select_options WHERE database_id = ?', (database.id,))
+    stored = {row['id']: (row['property_id'], row['name'], row['color']) for row in cursor.fetchall()}
+
+    wanted = {}
+    for prop in database.properties.values():
+        if prop.type == 'select' and prop.options:
+            for option in prop.options:
+                wanted[option.id] = (prop.id, option.name, option.color)
+
+    removed = [(option_id,) for option_id in stored if option_id not in wanted]
+    changed = [(option_id, database.id) + row for option_id, row in wanted.items() if stored.get(option_id) != row]
+
+    if removed:
+        cursor.executemany('DELETE FROM select_options WHERE id = ?', removed)
+    if changed:
+        cursor.executemany('''
+            INSERT INTO select_options (id, database_id, property_id, name, color)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                database_id = excluded.database_id,
+                property_id = excluded.property_id,
+                name = excluded.name,
+                color = excluded.color
+        ''', changed)
+
+def _link(table: str, owner_column: str, child_column: str, owner_table: str, owner_id: str, child_id: str) -> bool:
+    """Append one relationship row after the owner's last position; returns False if the owner does not exist. The caller commits"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    default_page_id = str(uuid.uuid4())
-    default_block_id = str(uuid.uuid4())
-    current_time = datetime.now().isoformat()
-    
-    # Insert default page
+    cursor.execute(f'''
+        INSERT OR IGNORE INTO {table} ({owner_column}, {child_column}, position)
+        SELECT ?, ?, COALESCE((SELECT MAX(position) FROM {table} WHERE {owner_column} = ?), 0) + 1
+        WHERE EXISTS (SELECT 1 FROM {owner_table} WHERE id = ?)
+    ''', (owner_id, child_id, owner_id, owner_id))
+    return cursor.rowcount > 0
+
+def _unlink(table: str, owner_column: str, child_column: str, owner_id: str, child_id: str) -> bool:
+    """Delete one relationship row. The caller commits"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f'DELETE FROM {table} WHERE {owner_column} = ? AND {child_column} = ?', (owner_id, child_id))
+    return cursor.rowcount > 0
+
+def link_page_to_database(database_id: str, page_id: str) -> bool:
+    """Append a page to a database's rows without rewriting the database"""
+    linked = _link('database_pages', 'database_id', 'page_id', 'databases', database_id, page_id)
+    if linked:
+        _after_commit(workspace_cache.add_link, 'database', database_id, page_id)
+    _commit(get_db_connection())
+    return linked
+
+def unlink_page_from_database(database_id: str, page_id: str) -> bool:
+    """Remove a page from a database's rows without rewriting the database"""
+    unlinked = _unlink('database_pages', 'database_id', 'page_id', database_id, page_id)
+    _after_commit(workspace_cache.remove_link, 'database', database_id, page_id)
+    _commit(get_db_connection())
+    return unlinked
+
+def link_database_to_page(page_id: str, database_id: str) -> bool:
+    """Append a database to a page's child databases without rewriting the page"""
+    linked = _link('page_databases', 'page_id', 'database_id', 'pages', page_id, database_id)
+    if linked:
+        _after_commit(workspace_cache.add_link, 'page', page_id, database_id)
+    _commit(get_db_connection())
+    return linked
+
+def unlink_database_from_page(page_id: str, database_id: str) -> bool:
+    """Remove a database from a page's child databases without rewriting the page"""
+    unlinked = _unlink('page_databases', 'page_id', 'database_id', page_id, database_id)
+    _after_commit(workspace_cache.remove_link, 'page', page_id, database_id)
+    _commit(get_db_connection())
+    return unlinked
+
+def _place_in_hierarchy(cursor, node_type: str, node_id: str, parent_id: Optional[str]):
+    """Attach a node, with everything below it, under parent_id in hierarchy_closure"""
+    cursor.execute('INSERT OR IGNORE INTO hierarchy_closure VALUES (?, ?, ?, 0)', (node_id, node_type, node_id))
+    # Detach the subtree from its old ancestors
     cursor.execute('''
-        INSERT INTO pages (id, title, parent_database_id, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (default_page_id, "Welcome to Your Workspace", None, current_time, current_time))
-    
-    # Insert default block
+        DELETE FROM hierarchy_closure
+        WHERE descendant_id IN (SELECT descendant_id FROM hierarchy_closure WHERE ancestor_id = ?)
+          AND ancestor_id NOT IN (SELECT descendant_id FROM hierarchy_closure WHERE ancestor_id = ?)
+    ''', (node_id, node_id))
+    if parent_id is None:
+        return
+    cursor.execute('SELECT 1 FROM hierarchy_closure WHERE descendant_id = ? AND ancestor_id = ?', (parent_id, node_id))
+    if cursor.fetchone() is not None:
+        return  # parent_id lies inside the subtree; linking it would create a cycle
     cursor.execute('''
-        INSERT INTO blocks (id, type, content, parent_id, children)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (default_block_id, 'page', json.dumps({'page_id': default_page_id}), None, json.dumps([])))
-    
-    conn.commit()
-    conn.close()
-    
-    # Create in-memory objects
-    default_page = Page(
-        id=default_page_id,
-        title="Welcome to Your Workspace",
-        properties={},
-        databases=[],
-        created_at=current_time,
-        updated_at=current_time
-    )
-    
-    default_block = Block(
-        id=default_block_id,
-        type='page',
-        content={'page_id': default_page_id},
-        children=[]
-    )
-    
-    data.pages[default_page_id] = default_page
-    data.blocks[default_block_id] = default_block
+        INSERT INTO hierarchy_closure (ancestor_id, ancestor_type, descendant_id, depth)
+        SELECT above.ancestor_id, above.ancestor_type, below.descendant_id, above.depth + below.depth + 1
+        FROM hierarchy_closure above, hierarchy_closure below
+        WHERE above.descendant_id = ? AND below.ancestor_id = ?
+    ''', (parent_id, node_id))
 
 def save_page(page: Page):
-    """Save a single page to database"""
+    """Save a single page to database, writing only the rows that changed"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    cursor.execute('SELECT parent_database_id, title FROM pages WHERE id = ?', (page.id,))
+    stored = cursor.fetchone()
     cursor.execute('''
-        INSERT OR REPLACE INTO pages (id, title, parent_database_id, created_at, updated_at)
+        INSERT INTO pages (id, title, parent_database_id, created_at, updated_at)
         VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            title = excluded.title,
+            parent_database_id = excluded.parent_database_id,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at
     ''', (page.id, page.title, page.parent_database_id, page.created_at, page.updated_at))
+    if stored is None or stored['parent_database_id'] != page.parent_database_id:
+        _place_in_hierarchy(cursor, 'page', page.id, page.parent_database_id)
     
-    # Save properties
-    cursor.execute('DELETE FROM properties WHERE owner_id = ? AND owner_type = ?', (page.id, 'page'))
-    for prop_id, prop in page.properties.items():
-        cursor.execute('''
-            INSERT INTO properties (id, owner_id, owner_type, name, type, value, rich_text_content)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (prop.id, page.id, 'page', prop.name, prop.type, 
-              json.dumps(prop.value) if prop.value is not None else None,
-              prop.rich_text_content))
+    changed_types = _sync_properties(cursor, page.id, 'page', page.properties, page.parent_database_id)
+    if 'date' in changed_types:
+        refresh_page_occurrences(cursor, page)
+        refresh_task_stats(cursor, page.id)
+    if stored is None or stored['title'] != page.title or changed_types & {'text', 'rich_text'}:
+        index_page_for_search(cursor, page)
+    
+    _after_commit(workspace_cache.put_page, page)
+    _commit(conn)
+
+def save_page_property(page_id: str, prop: Property, updated_at: str) -> Property:
+    """Upsert a single property row of a page and bump the page's updated_at; returns the stored property"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    # Save page-database relationships
-    cursor.execute('DELETE FROM page_databases WHERE page_id = ?', (page.id,))
-    if page.databases:
-        for db_id in page.databases:
-            cursor.execute('INSERT INTO page_databases (page_id, database_id) VALUES (?, ?)', (page.id, db_id))
+    # An existing row keeps its name and type; only the value changes
+    cursor.execute('SELECT name, type FROM properties WHERE id = ? AND owner_id = ?', (prop.id, page_id))
+    existing = cursor.fetchone()
+    if existing is not None:
+        prop = Property(id=prop.id, name=existing['name'], type=existing['type'],
+                        value=prop.value, rich_text_content=prop.rich_text_content)
+    stored_value = json.dumps(prop.value) if prop.value is not None else None
+    cursor.execute('''
+        INSERT INTO properties (id, owner_id, owner_type, name, type, value, rich_text_content, database_id,
+                                num_value, date_start, date_end, option_id)
+        VALUES (?, ?, 'page', ?, ?, ?, ?, (SELECT NULLIF(parent_database_id, '') FROM pages WHERE id = ?), ?, ?, ?, ?)
+        ON CONFLICT (id, owner_id) DO UPDATE SET
+            value = excluded.value,
+            rich_text_content = excluded.rich_text_content,
+            database_id = excluded.database_id,
+            num_value = excluded.num_value,
+            date_start = excluded.date_start,
+            date_end = excluded.date_end,
+            option_id = excluded.option_id
+    ''', (prop.id, page_id, prop.name, prop.type, stored_value, prop.rich_text_content, page_id)
+          + _typed_property_columns(prop.type, stored_value))
+    cursor.execute('UPDATE pages SET updated_at = ? WHERE id = ?', (updated_at, page_id))
+    
+    if prop.type in ('date', 'text', 'rich_text'):
+        for page in _load_pages_by_query(cursor, 'p.id = ?', (page_id,)):
+            if prop.type == 'date':
+                refresh_page_occurrences(cursor, page)
+                refresh_task_stats(cursor, page_id)
+            else:
+                index_page_for_search(cursor, page)
     
-    conn.commit()
-    conn.close()
+    _after_commit(workspace_cache.put_page_property, page_id, prop, updated_at)
+    _commit(conn)
+    return prop
 
 def save_database(database: Database):
-    """Save a single database to database"""
+    """Save a single database to database, writing only the rows that changed"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
+    cursor.execute('SELECT parent_page_id FROM databases WHERE id = ?', (database.id,))
+    stored = cursor.fetchone()
     cursor.execute('''
-        INSERT OR REPLACE INTO databases (id, name, parent_page_id, created_at, updated_at, color)
+        INSERT INTO databases (id, name, parent_page_id, created_at, updated_at, color)
         VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            name = excluded.name,
+            parent_page_id = excluded.parent_page_id,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at,
+            color = excluded.color
     ''', (database.id, database.name, database.parent_page_id, database.created_at, database.updated_at, database.color))
+    if stored is None or stored['parent_page_id'] != database.parent_page_id:
+        _place_in_hierarchy(cursor, 'database', database.id, database.parent_page_id)
     
-    # Save properties
-    cursor.execute('DELETE FROM properties WHERE owner_id = ? AND owner_type = ?', (database.id, 'database'))
-    cursor.execute('DELETE FROM select_options WHERE database_id = ?', (database.id,))
-
-    for prop_id, prop in database.properties.items():
-        cursor.execute('''
-            INSERT INTO properties (id, owner_id, owner_type, name, type, value, rich_text_content)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (prop.id, database.id, 'database', prop.name, prop.type,
-              json.dumps(prop.value) if prop.value is not None else None,
-              prop.rich_text_content))
-        
-        if prop.type == 'select' and prop.options:
-            for option in prop.options:
-                cursor.execute('''
-                    INSERT INTO select_options (id, property_id, database_id, name, color)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (option.id, prop.id, database.id, option.name, option.color))
-
-    # Save database-page relationships
-    cursor.execute('DELETE FROM database_pages WHERE database_id = ?', (database.id,))
-    if database.pages:
-        for page_id in database.pages:
-            cursor.execute('INSERT INTO database_pages (database_id, page_id) VALUES (?, ?)', (database.id, page_id))
+    _sync_properties(cursor, database.id, 'database', database.properties)
+    _sync_select_options(cursor, database)
     
-    conn.commit()
-    conn.close()
+    _after_commit(workspace_cache.put_database, database)
+    _commit(conn)
+
+def _block_entity_id(content: Dict[str, Any]) -> Optional[str]:
+    """The page or database id a block's content refers to"""
+    return content.get('page_id') or content.get('database_id')
 
 def save_block(block: Block):
     """Save a single block to database"""
@@ -421,58 +1420,39 @@ def save_block(block: Block):
     cursor = conn.cursor()
     
     cursor.execute('''
-        INSERT OR REPLACE INTO blocks (id, type, content, parent_id, children)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (block.id, block.type, json.dumps(block.content), block.parent_id, json.dumps(block.children)))
+        INSERT OR REPLACE INTO blocks (id, type, content, parent_id, children, entity_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (block.id, block.type, json.dumps(block.content), block.parent_id, json.dumps(block.children),
+          _block_entity_id(block.content)))
     
-    conn.commit()
-    conn.close()
+    _after_commit(workspace_cache.put_block, block)
+    _commit(conn)
 
 def save_completion_log(page_id: str, log: CompletionLog):
     """Save a completion log to database"""
+    save_completion_logs([(page_id, log)])
+
+def save_completion_logs(entries: List[tuple]):
+    """Save many (page_id, CompletionLog) pairs with one statement and one commit"""
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    cursor.execute('''
+    cursor.executemany('''
         INSERT OR REPLACE INTO completion_logs (page_id, date, completed, timestamp)
         VALUES (?, ?, ?, ?)
-    ''', (page_id, log.date, int(log.completed), log.timestamp))
-    
-    conn.commit()
-    conn.close()
-
-def delete_page_from_db(page_id: str):
-    """Delete a page and all related data from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM pages WHERE id = ?', (page_id,))
-    cursor.execute('DELETE FROM properties WHERE owner_id = ? AND owner_type = ?', (page_id, 'page'))
-    cursor.execute('DELETE FROM page_databases WHERE page_id = ?', (page_id,))
-    cursor.execute('DELETE FROM database_pages WHERE page_id = ?', (page_id,))
-    cursor.execute('DELETE FROM completion_logs WHERE page_id = ?', (page_id,))
-    cursor.execute('DELETE FROM blocks WHERE type = ? AND content LIKE ?', ('page', f'%"page_id": "{page_id}"%'))
-    
-    conn.commit()
-    conn.close()
-
-def delete_database_from_db(database_id: str):
-    """Delete a database and all related data from database"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM databases WHERE id = ?', (database_id,))
-    cursor.execute('DELETE FROM properties WHERE owner_id = ? AND owner_type = ?', (database_id, 'database'))
-    cursor.execute('DELETE FROM select_options WHERE database_id = ?', (database_id,))
-    cursor.execute('DELETE FROM page_databases WHERE database_id = ?', (database_id,))
-    cursor.execute('DELETE FROM database_pages WHERE database_id = ?', (database_id,))
-    cursor.execute('DELETE FROM blocks WHERE type = ? AND content LIKE ?', ('database', f'%"database_id": "{database_id}"%'))
+    ''', [(page_id, log.date, int(log.completed), log.timestamp) for page_id, log in entries])
+    logs_by_page: Dict[str, List[CompletionLog]] = {}
+    for page_id, log in entries:
+        logs_by_page.setdefault(page_id, []).append(log)
+    for page_id, page_logs in logs_by_page.items():
+        if len(page_logs) == 1:
+            record_completion_stats(cursor, page_id, page_logs[0])
+        else:
+            refresh_task_stats(cursor, page_id)
     
-    conn.commit()
-    conn.close()
-
-# Initialize database on startup
-init_database()
+    for page_id, log in entries:
+        _after_commit(workspace_cache.put_completion_log, page_id, log)
+    _commit(conn)
 
 def get_date_property(page: Page) -> Optional[Property]:
     """Get the date property from a page"""
@@ -488,154 +1468,763 @@ def get_status_property(page: Page) -> Optional[Property]:
             return prop
     return None
 
-def calculate_repetition_dates(start_date: str, repetition_type: str, repetition_config: dict) -> List[str]:
-    """Calculate all dates for a repeating task, supporting advanced options."""
-    try:
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+# --- Recurrence ---
+
+# Repeating tasks without an end date or count are expanded this far past their start
+DEFAULT_REPETITION_DAYS = 365
+
+class RecurrenceRule:
+    """
+    RRULE-style recurrence for a date property. Occurrences are computed
+    arithmetically (no day-by-day stepping) and generated lazily from any
+    window start. `count` limits the series like RRULE COUNT and
+    `exclusions` removes single dates like EXDATE (excluded dates still
+    count towards `count`).
+    """
+    def __init__(self, start: date_type, freq: str, interval: int = 1,
+                 weekdays: Optional[List[int]] = None, month_day: Optional[int] = None,
+                 until: Optional[date_type] = None, count: Optional[int] = None,
+                 exclusions=()):
+        if freq not in ('daily', 'weekly', 'monthly'):
+            raise ValueError(f"Unsupported repetition frequency: {freq}")
+        self.start = start
+        self.freq = freq
+        self.interval = max(1, int(interval or 1))
+        self.weekdays = sorted(set(weekdays)) if weekdays is not None else [start.weekday()]
+        self.month_day = month_day or start.day
+        if not 1 <= self.month_day <= 31:
+            raise ValueError(f"Invalid day of month: {self.month_day}")
+        self.until = until
+        self.count = count
+        self.exclusions = set(exclusions)
+
+    @classmethod
+    def from_date_value(cls, start_date: str, repetition_type: str, repetition_config: dict) -> 'RecurrenceRule':
+        """Build a rule from the repetition fields stored in a date property"""
+        repetition_config = repetition_config or {}
+        start = datetime.fromisoformat(start_date.replace('Z', '+00:00')).date()
+        count = repetition_config.get('count')
         end_date = repetition_config.get('end_date')
         if end_date:
-            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+            until = datetime.fromisoformat(end_date.replace('Z', '+00:00')).date()
+        elif count:
+            until = None
         else:
-            # Default: 1 year from start
-            end = start + timedelta(days=365)
-        
-        dates = []
-        
+            until = start + timedelta(days=DEFAULT_REPETITION_DAYS)
+        exclusions = [datetime.fromisoformat(d).date() for d in repetition_config.get('exclude_dates') or []]
+        interval = repetition_config.get('interval', 1)
+
         if repetition_type == 'daily':
-            interval = repetition_config.get('interval', 1)
-            current = start
-            while current <= end:
-                dates.append(current.date().isoformat())
-                current += timedelta(days=interval)
-        
-        elif repetition_type == 'weekly':
-            interval = repetition_config.get('interval', 1)
-            days_of_week = repetition_config.get('days_of_week', [start.weekday()])
-            current = start
-            while current <= end:
-                if current.weekday() in days_of_week:
-                    dates.append(current.date().isoformat())
-                current += timedelta(days=1)
-        
-        elif repetition_type == 'monthly':
-            interval = repetition_config.get('interval', 1)
-            day = repetition_config.get('day', start.day)
-            current = start
-            while current <= end:
-                try:
-                    d = current.replace(day=day)
-                    if d >= start and d <= end:
-                        dates.append(d.date().isoformat())
-                except ValueError:
-                    pass
-                month = current.month + interval
-                year = current.year + (month - 1) // 12
-                month = (month - 1) % 12 + 1
-                current = current.replace(year=year, month=month)
-        
-        elif repetition_type == 'custom':
-            interval = repetition_config.get('interval', 1)
-            days_of_week = repetition_config.get('days_of_week', [start.weekday()])
-            # days_of_week should be 0=Monday, 6=Sunday (Python's weekday)
-            # If frontend sends 1=Monday, 3=Wednesday, 5=Friday, convert to Python weekday
-            days_of_week = [((d - 1) % 7) for d in days_of_week]
-            current = start
-            while current <= end:
-                if current.weekday() in days_of_week:
-                    dates.append(current.date().isoformat())
-                current += timedelta(days=1)
-        
-        return sorted(list(set(dates)))
+            return cls(start, 'daily', interval, until=until, count=count, exclusions=exclusions)
+        if repetition_type in ('weekly', 'custom'):
+            days_of_week = repetition_config.get('days_of_week')
+            if days_of_week is not None and repetition_type == 'custom':
+                # Custom rules use 0=Sunday..6=Saturday (as sent by the frontend); convert to Python's 0=Monday
+                days_of_week = [((d - 1) % 7) for d in days_of_week]
+            return cls(start, 'weekly', interval, weekdays=days_of_week, until=until, count=count, exclusions=exclusions)
+        if repetition_type == 'monthly':
+            return cls(start, 'monthly', interval, month_day=repetition_config.get('day'),
+                       until=until, count=count, exclusions=exclusions)
+        raise ValueError(f"Unknown repetition type: {repetition_type}")
+
+    def occurrences(self, window_start: Optional[date_type] = None, window_end: Optional[date_type] = None):
+        """Yield occurrence dates in [window_start, window_end), in order"""
+        from_date = max(window_start, self.start) if window_start else self.start
+        for ordinal, day in self._iter_from(from_date):
+            if self.count is not None and ordinal >= self.count:
+                return
+            if (self.until is not None and day > self.until) or (window_end is not None and day >= window_end):
+                return
+            if day not in self.exclusions:
+                yield day
+
+    def _iter_from(self, from_date: date_type):
+        """Yield (ordinal, date) for every occurrence on or after from_date; ordinal counts from the series start"""
+        if self.freq == 'daily':
+            k = -(-(from_date - self.start).days // self.interval)
+            while True:
+                yield k, self.start + timedelta(days=k * self.interval)
+                k += 1
+
+        elif self.freq == 'weekly':
+            if not self.weekdays:
+                return
+            week0 = self.start - timedelta(days=self.start.weekday())
+            first_week_days = [wd for wd in self.weekdays if wd >= self.start.weekday()]
+            period = (from_date - week0).days // (7 * self.interval)
+            ordinal = len(first_week_days) + (period - 1) * len(self.weekdays) if period > 0 else 0
+            while True:
+                week_start = week0 + timedelta(weeks=period * self.interval)
+                for wd in (first_week_days if period == 0 else self.weekdays):
+                    day = week_start + timedelta(days=wd)
+                    if day >= from_date:
+                        yield ordinal, day
+                    ordinal += 1
+                period += 1
+
+        else:  # monthly
+            month_index = self.start.year * 12 + self.start.month - 1
+            ordinal = 0
+            misses = 0
+            # A day that never fits the stepped months (e.g. the 31st every 12 months from February) yields nothing
+            while misses < 48:
+                year, month = divmod(month_index, 12)
+                month += 1
+                if self.until is not None and date_type(year, month, 1) > self.until:
+                    return
+                if self.month_day <= calendar.monthrange(year, month)[1]:
+                    misses = 0
+                    day = date_type(year, month, self.month_day)
+                    if day >= self.start:
+                        if day >= from_date:
+                            yield ordinal, day
+                        ordinal += 1
+                else:
+                    misses += 1
+                month_index += self.interval
+
+def calculate_repetition_dates(start_date: str, repetition_type: str, repetition_config: dict) -> List[str]:
+    """Calculate all dates for a repeating task, supporting advanced options."""
+    try:
+        rule = RecurrenceRule.from_date_value(start_date, repetition_type, repetition_config)
+        return [day.isoformat() for day in rule.occurrences()]
     except (ValueError, TypeError) as e:
-        print(f"Invalid start date for repetition: {start_date}, error: {e}")
+        print(f"Invalid repetition for start date {start_date}, error: {e}")
         return []
+
+# --- Completion log compaction ---
+# Detailed completion_logs rows older than COMPLETION_COMPACT_AFTER_DAYS are
+# folded, whole months at a time, into completion_months bitmaps. Readers merge
+# both; SQL joins use _COMPLETED_SQL with completion_logs c and completion_months m.
+
+COMPLETION_COMPACT_AFTER_DAYS = int(os.getenv('COMPLETION_COMPACT_AFTER_DAYS', '90'))
+
+_COMPLETION_JOINS = '''
+    LEFT JOIN completion_logs c ON c.page_id = o.page_id AND c.date = o.date
+    LEFT JOIN completion_months m ON m.page_id = o.page_id AND m.month = substr(o.date, 1, 7)
+'''
+_COMPLETED_SQL = 'COALESCE(c.completed, (m.completed_days >> (CAST(substr(o.date, 9, 2) AS INTEGER) - 1)) & 1, 0)'
+_ISO_DAY_GLOB = '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'
+
+def compact_completion_logs(older_than_days: Optional[int] = None) -> tuple:
+    """Fold detailed logs from months that ended more than older_than_days ago into bitmaps; returns (rows, months)"""
+    if older_than_days is None:
+        older_than_days = COMPLETION_COMPACT_AFTER_DAYS
+    cutoff = (date_type.today() - timedelta(days=older_than_days)).replace(day=1).isoformat()
+
+    with unit_of_work() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT page_id, date, completed FROM completion_logs
+            WHERE date < ? AND date GLOB ?
+        ''', (cutoff, _ISO_DAY_GLOB))
+        changes: Dict[tuple, List[int]] = {}  # (page_id, month) -> [bits to set, bits to clear]
+        rows = 0
+        for row in cursor.fetchall():
+            bit = 1 << (int(row['date'][8:10]) - 1)
+            change = changes.setdefault((row['page_id'], row['date'][:7]), [0, 0])
+            change[0 if row['completed'] else 1] |= bit
+            rows += 1
+        if not rows:
+            return 0, 0
+
+        existing = {}
+        for page_id, month in changes:
+            cursor.execute('SELECT completed_days FROM completion_months WHERE page_id = ? AND month = ?', (page_id, month))
+            found = cursor.fetchone()
+            existing[page_id, month] = found['completed_days'] if found else 0
+        cursor.executemany('INSERT OR REPLACE INTO completion_months (page_id, month, completed_days) VALUES (?, ?, ?)',
+                           [(page_id, month, (existing[page_id, month] & ~clear) | set_bits)
+                            for (page_id, month), (set_bits, clear) in changes.items()])
+        cursor.execute('DELETE FROM completion_logs WHERE date < ? AND date GLOB ?', (cutoff, _ISO_DAY_GLOB))
+        # Cached NotionData still holds the detailed rows; reload it from the new layout
+        _after_commit(workspace_cache.invalidate)
+    return rows, len(changes)
+
+@app.cli.command('compact-completions')
+def compact_completions_command():
+    """Fold old completion logs into per-month bitmaps (run periodically, e.g. from cron)"""
+    rows, months = compact_completion_logs()
+    print(f"Compacted {rows} completion logs into {months} page-months")
+
+# --- Materialized occurrences ---
+# occurrences holds one row per (page, date) a dated task falls on. Repeating
+# rules are materialized up to a rolling horizon; series that continue past
+# it are tracked in occurrence_series and extended on demand.
+
+OCCURRENCE_HORIZON_DAYS = int(os.getenv('OCCURRENCE_HORIZON_DAYS', '400'))
+_FIRST_DAY = '0001-01-01'
+_LAST_DAY = '9999-12-31'
+
+def _page_occurrences(page: Page, window_start: str, window_end: str):
+    """Yield (date, start_time, end_time, is_repeating) for a page's date property within [window_start, window_end)"""
+    date_prop = get_date_property(page)
+    if not date_prop or not date_prop.value:
+        return
+    if isinstance(date_prop.value, dict):
+        is_repeating = date_prop.value.get('repetition', False)
+        start_date = date_prop.value.get('start_date')
+        start_time = date_prop.value.get('start_time') or None
+        end_time = date_prop.value.get('end_time') or None
+        if is_repeating and start_date:
+            repetition_config = date_prop.value.get('repetition_config', {})
+            repetition_type = date_prop.value.get('repetition_type', 'daily')
+            rule = RecurrenceRule.from_date_value(start_date, repetition_type, repetition_config)
+            for day in rule.occurrences(date_type.fromisoformat(window_start), date_type.fromisoformat(window_end)):
+                yield day.isoformat(), start_time, end_time, True
+        elif start_date and window_start <= start_date[:10] < window_end:
+            yield start_date, start_time, end_time, False
+    elif isinstance(date_prop.value, str) and window_start <= date_prop.value[:10] < window_end:
+        yield date_prop.value, None, None, False
+
+def _occurrence_horizon() -> str:
+    """Exclusive end of the range every series is kept materialized for"""
+    return (date_type.today() + timedelta(days=OCCURRENCE_HORIZON_DAYS)).isoformat()
+
+def _materialize_occurrences(cursor, page: Page, from_day: str, until_day: str):
+    """Insert a page's occurrences in [from_day, until_day) and record whether its series continues past until_day"""
+    try:
+        rows = [(page.id, day, start_time, end_time, int(is_repeating))
+                for day, start_time, end_time, is_repeating in _page_occurrences(page, from_day, until_day)]
+        continues = next(_page_occurrences(page, until_day, _LAST_DAY), None) is not None
     except Exception as e:
-        print(f"Error calculating repetition dates: {e}")
+        print(f"Could not process date for page {page.id}: {e}")
+        rows, continues = [], False
+
+    if rows:
+        cursor.executemany('''
+            INSERT OR REPLACE INTO occurrences (page_id, date, start_time, end_time, is_repeating)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+    if continues:
+        cursor.execute('INSERT OR REPLACE INTO occurrence_series (page_id, materialized_until) VALUES (?, ?)',
+                       (page.id, until_day))
+    else:
+        cursor.execute('DELETE FROM occurrence_series WHERE page_id = ?', (page.id,))
+
+def refresh_page_occurrences(cursor, page: Page):
+    """Rebuild a page's materialized occurrences after its date property changed"""
+    cursor.execute('DELETE FROM occurrences WHERE page_id = ?', (page.id,))
+    _materialize_occurrences(cursor, page, _FIRST_DAY, _occurrence_horizon())
+
+def ensure_occurrences_through(until_day: str):
+    """Extend every open-ended series so occurrences before until_day (exclusive) are materialized"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT page_id, materialized_until FROM occurrence_series WHERE materialized_until < ?', (until_day,))
+    pending = {row['page_id']: row['materialized_until'] for row in cursor.fetchall()}
+    if not pending:
+        return 0
+
+    for page in load_pages(list(pending)).values():
+        _materialize_occurrences(cursor, page, pending[page.id], until_day)
+    _commit(conn)
+    return len(pending)
+
+@app.cli.command('extend-occurrences')
+def extend_occurrences_command():
+    """Roll the materialized occurrence horizon forward (run daily, e.g. from cron)"""
+    extended = ensure_occurrences_through(_occurrence_horizon())
+    print(f"Extended {extended} repeating series through {_occurrence_horizon()}")
+
+# --- Task statistics ---
+# task_stats keeps running aggregates over each task's occurrences up to as_of
+# (normally today). Writes after as_of cost nothing, completing today's
+# occurrence is an O(1) update, and other writes recompute that one page.
+# Reads roll stale rows forward over only the days that passed since as_of.
+# Tasks with no occurrence up to as_of have no row; a read computes it once
+# their first occurrence has arrived.
+
+TASK_STATS_FIELDS = ['as_of', 'expected_count', 'completed_count', 'current_streak', 'longest_streak',
+                     'last_completed_date', 'pending', 'month', 'month_expected', 'month_completed']
+
+def _empty_task_stats(as_of: str) -> Dict[str, Any]:
+    stats = dict.fromkeys(TASK_STATS_FIELDS, 0)
+    stats.update(as_of=as_of, last_completed_date=None, month=as_of[:7])
+    return stats
+
+def _advance_task_stats(stats: Dict[str, Any], rows, as_of: str):
+    """Fold the (date, completed) occurrences after stats['as_of'] up to and including as_of into stats"""
+    if stats['pending'] and as_of > stats['as_of']:
+        # The occurrence that was still open on the old as_of day went by uncompleted
+        stats['current_streak'] = 0
+        stats['pending'] = 0
+    for day, completed in rows:
+        if day[:7] != stats['month']:
+            stats.update(month=day[:7], month_expected=0, month_completed=0)
+        stats['expected_count'] += 1
+        stats['month_expected'] += 1
+        if completed:
+            stats['completed_count'] += 1
+            stats['month_completed'] += 1
+            stats['current_streak'] += 1
+            stats['longest_streak'] = max(stats['longest_streak'], stats['current_streak'])
+            stats['last_completed_date'] = day
+        elif day[:10] == as_of:
+            stats['pending'] = 1  # today's occurrence can still be completed
+        else:
+            stats['current_streak'] = 0
+    if as_of[:7] != stats['month']:
+        stats.update(month=as_of[:7], month_expected=0, month_completed=0)
+    stats['as_of'] = as_of
+
+def _next_day(day: str) -> str:
+    return (date_type.fromisoformat(day[:10]) + timedelta(days=1)).isoformat()
+
+def _occurrence_completions(cursor, page_id: str, start: str, end: str):
+    """(date, completed) for a page's occurrences with start <= date < end"""
+    cursor.execute(f'''
+        SELECT o.date, {_COMPLETED_SQL} AS completed
+        FROM occurrences o
+        {_COMPLETION_JOINS}
+        WHERE o.page_id = ? AND o.date >= ? AND o.date < ?
+        ORDER BY o.date
+    ''', (page_id, start, end))
+    return [(row['date'], row['completed']) for row in cursor.fetchall()]
+
+def _store_task_stats(cursor, page_id: str, stats: Dict[str, Any]):
+    placeholders = ', '.join('?' * (len(TASK_STATS_FIELDS) + 1))
+    cursor.execute(f'INSERT OR REPLACE INTO task_stats (page_id, {", ".join(TASK_STATS_FIELDS)}) VALUES ({placeholders})',
+                   (page_id, *(stats[field] for field in TASK_STATS_FIELDS)))
+
+def refresh_task_stats(cursor, page_id: str, as_of: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Recompute a page's statistics from its occurrences and completion logs; None if nothing is due yet"""
+    as_of = as_of or date_type.today().isoformat()
+    stats = _empty_task_stats(as_of)
+    _advance_task_stats(stats, _occurrence_completions(cursor, page_id, '', _next_day(as_of)), as_of)
+    if stats['expected_count']:
+        _store_task_stats(cursor, page_id, stats)
+        return stats
+    cursor.execute('DELETE FROM task_stats WHERE page_id = ?', (page_id,))
+    return None
+
+def record_completion_stats(cursor, page_id: str, log: CompletionLog, as_of: Optional[str] = None):
+    """Bring a page's statistics up to date after a completion log write"""
+    as_of = as_of or date_type.today().isoformat()
+    cursor.execute('SELECT * FROM task_stats WHERE page_id = ?', (page_id,))
+    row = cursor.fetchone()
+    if row is not None and row['as_of'] == as_of:
+        if log.date > as_of:
+            return  # not counted until its day arrives
+        if log.date == as_of and log.completed and row['pending']:
+            stats = {field: row[field] for field in TASK_STATS_FIELDS}
+            stats.update(pending=0, last_completed_date=log.date)
+            stats['completed_count'] += 1
+            stats['month_completed'] += 1
+            stats['current_streak'] += 1
+            stats['longest_streak'] = max(stats['longest_streak'], stats['current_streak'])
+            _store_task_stats(cursor, page_id, stats)
+            return
+    refresh_task_stats(cursor, page_id, as_of)
+
+def load_task_stats(page_ids: List[str], as_of: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Statistics for several pages, rolling rows forward to as_of (default today) where they are stale"""
+    as_of = as_of or date_type.today().isoformat()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    stats_by_page = {}
+    stale = False
+    for i in range(0, len(page_ids), 500):
+        chunk = page_ids[i:i + 500]
+        placeholders = ', '.join('?' * len(chunk))
+        cursor.execute(f'SELECT * FROM task_stats WHERE page_id IN ({placeholders})', chunk)
+        for row in cursor.fetchall():
+            stats = {field: row[field] for field in TASK_STATS_FIELDS}
+            if stats['as_of'] < as_of:
+                rows = _occurrence_completions(cursor, row['page_id'], _next_day(stats['as_of']), _next_day(as_of))
+                _advance_task_stats(stats, rows, as_of)
+                _store_task_stats(cursor, row['page_id'], stats)
+                stale = True
+            stats_by_page[row['page_id']] = stats
+        
+        # Tasks without a row whose first occurrence has arrived since they were last written
+        missing = [page_id for page_id in chunk if page_id not in stats_by_page]
+        if missing:
+            cursor.execute(f'''
+                SELECT DISTINCT page_id FROM occurrences
+                WHERE page_id IN ({', '.join('?' * len(missing))}) AND date <= ?
+            ''', (*missing, as_of))
+            for row in cursor.fetchall():
+                stats_by_page[row['page_id']] = refresh_task_stats(cursor, row['page_id'], as_of)
+                stale = True
+    if stale:
+        _commit(conn)
+    return stats_by_page
+
+# --- Database queries ---
+
+# /api/query_database returns this many pages unless a limit is given, and never more than the maximum
+QUERY_PAGE_SIZE = 100
+MAX_QUERY_PAGE_SIZE = 1000
+
+# Page columns that can be filtered and sorted on alongside the database's properties
+_QUERY_PAGE_COLUMNS = {'title': ('text', 'p.title'), 'created_at': ('date', 'p.created_at'),
+                       'updated_at': ('date', 'p.updated_at')}
+
+# Which filter operators each property type accepts
+_QUERY_OPERATORS = {
+    'text': {'equals', 'contains', 'in'},
+    'rich_text': {'equals', 'contains'},
+    'number': {'equals', 'range'},
+    'date': {'equals', 'range'},
+    'select': {'equals', 'in'},
+    'status': {'equals', 'in'},
+}
+
+class QueryError(ValueError):
+    """A filter, sort or page window that does not fit the queried database"""
+
+def _property_expression(alias: str, property_type: str) -> str:
+    """SQL for the comparable value of a joined properties row, by property type"""
+    if property_type == 'number':
+        return f'{alias}.num_value'
+    if property_type == 'date':
+        return f'{alias}.date_start'
+    if property_type in ('select', 'status'):
+        return f'{alias}.option_id'
+    if property_type == 'rich_text':
+        return f'{alias}.rich_text_content'
+    return f"json_extract({alias}.value, '$')"
+
+def _query_operand(property_type: str, value):
+    """A filter value converted to what _property_expression compares against"""
+    if property_type == 'number':
+        if isinstance(value, bool):
+            raise QueryError('Expected a number')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise QueryError('Expected a number')
+    if property_type == 'date':
+        try:
+            return date_type.fromisoformat(str(value)[:10]).isoformat()
+        except ValueError:
+            raise QueryError('Expected an ISO date')
+    if not isinstance(value, str):
+        raise QueryError('Expected a string')
+    return value
+
+def _build_database_query(database: Database, filters: List[Dict[str, Any]], sorts: List[Dict[str, Any]]) -> tuple:
+    """
+    Translate filters ({'property', 'op', 'value'}) and sorts ({'property', 'direction'}) into
+    (joins, join_params, where, where_params, order_by); 'property' is a property id or title/created_at/updated_at.
+    Each property used is joined once on (database_id, id), so filters on number, date and select
+    values can start from the typed-column indexes; properties that are only sorted on are left-joined.
+    """
+    joins, join_params = [], []
+    aliases = {}
+
+    def column(property_id, filtered):
+        if not isinstance(property_id, str):
+            raise QueryError('Each filter and sort needs a property')
+        if property_id in _QUERY_PAGE_COLUMNS:
+            property_type, expression = _QUERY_PAGE_COLUMNS[property_id]
+            if property_type == 'date':
+                expression = f'substr({expression}, 1, 10)'
+            return property_type, expression
+        definition = database.properties.get(property_id)
+        if definition is None or definition.type not in _QUERY_OPERATORS:
+            raise QueryError(f'Unknown property: {property_id}')
+        if property_id not in aliases:
+            alias = aliases[property_id] = f'v{len(aliases)}'
+            joins.append(f"{'JOIN' if filtered else 'LEFT JOIN'} properties {alias} ON {alias}.database_id = ? "
+                         f"AND {alias}.id = ? AND {alias}.owner_id = p.id AND {alias}.owner_type = 'page'")
+            join_params.extend((database.id, property_id))
+        return definition.type, _property_expression(aliases[property_id], definition.type)
+
+    where, where_params = [], []
+    for condition in filters:
+        if not isinstance(condition, dict):
+            raise QueryError('Each filter must be an object')
+        property_id, op, value = condition.get('property'), condition.get('op'), condition.get('value')
+        property_type, expression = column(property_id, True)
+        if op not in _QUERY_OPERATORS[property_type]:
+            raise QueryError(f'Operator {op!r} is not supported for {property_type} properties')
+        if op == 'equals':
+            where.append(f'{expression} = ?')
+            where_params.append(_query_operand(property_type, value))
+        elif op == 'contains':
+            needle = _query_operand(property_type, value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append(f"{expression} LIKE ? ESCAPE '\\'")
+            where_params.append(f'%{needle}%')
+        elif op == 'in':
+            if not isinstance(value, list):
+                raise QueryError("'in' expects a list")
+            if not value:
+                where.append('0')
+                continue
+            where.append(f"{expression} IN ({', '.join('?' * len(value))})")
+            where_params.extend(_query_operand(property_type, item) for item in value)
+        else:
+            bounds = value if isinstance(value, dict) else {}
+            if bounds.get('min') is None and bounds.get('max') is None:
+                raise QueryError("'range' expects {'min': ..., 'max': ...}")
+            if bounds.get('min') is not None:
+                where.append(f'{expression} >= ?')
+                where_params.append(_query_operand(property_type, bounds['min']))
+            if bounds.get('max') is not None:
+                where.append(f'{expression} <= ?')
+                where_params.append(_query_operand(property_type, bounds['max']))
+
+    order_by = []
+    for sort in sorts:
+        if not isinstance(sort, dict):
+            raise QueryError('Each sort must be an object')
+        direction = (sort.get('direction') or 'asc').lower()
+        if direction not in ('asc', 'desc'):
+            raise QueryError("Sort direction must be 'asc' or 'desc'")
+        property_type, expression = column(sort.get('property'), False)
+        if property_type in ('select', 'status'):
+            expression = f'(SELECT name FROM select_options WHERE id = {expression})'
+        elif property_type in ('text', 'rich_text'):
+            expression = f'{expression} COLLATE NOCASE'
+        order_by.append(f'{expression} {direction.upper()} NULLS LAST')
+    # Ties keep the database's row order
+    order_by.append('l.position')
+
+    return ' '.join(joins), join_params, ' AND '.join(where) or '1', where_params, ', '.join(order_by)
+
+def query_database_pages(database: Database, filters: List[Dict[str, Any]], sorts: List[Dict[str, Any]],
+                         offset: int, limit: int) -> tuple:
+    """One window of a database's pages matching filters, in sort order, as (pages, total, next_offset)"""
+    joins, join_params, where, where_params, order_by = _build_database_query(database, filters, sorts)
+    cursor = get_db_connection().cursor()
+    base = f'''
+        FROM database_pages l JOIN pages p ON p.id = l.page_id
+        {joins}
+        WHERE l.database_id = ? AND {where}
+    '''
+    base_params = tuple(join_params) + (database.id,) + tuple(where_params)
+    cursor.execute(f'SELECT COUNT(*) {base}', base_params)
+    total = cursor.fetchone()[0]
+    cursor.execute(f'SELECT p.id {base} ORDER BY {order_by} LIMIT ? OFFSET ?', base_params + (limit, offset))
+    page_ids = [row['id'] for row in cursor.fetchall()]
+
+    loaded = load_pages(page_ids)
+    pages = [loaded[page_id] for page_id in page_ids if page_id in loaded]
+    next_offset = offset + limit if offset + limit < total else None
+    return pages, total, next_offset
+
+# --- Full-text search ---
+# search_index is an FTS5 table over page titles with their text and rich text
+# property values, and over the markdown notes in NOTES_DIR. search_documents
+# maps each page id or note path to its FTS rowid, so a single document can be
+# replaced or dropped whenever it is saved or deleted.
+
+SEARCH_RESULT_LIMIT = 20
+MAX_SEARCH_RESULT_LIMIT = 100
+
+# Highlight markers; swapped for <mark> after the matched text is HTML-escaped
+_MARK_START, _MARK_END = '\x02', '\x03'
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+def _html_to_text(markup: Optional[str]) -> str:
+    return html.unescape(_HTML_TAG.sub(' ', markup or ''))
+
+def _page_search_body(page: Page) -> str:
+    """The searchable text of a page: its text and rich text property values"""
+    parts = []
+    for prop in (page.properties or {}).values():
+        if prop.type == 'rich_text':
+            parts.append(_html_to_text(prop.rich_text_content))
+        elif prop.type == 'text' and isinstance(prop.value, str):
+            parts.append(prop.value)
+    return '\n'.join(part for part in parts if part.strip())
+
+def _index_search_document(cursor, kind: str, ref: str, title: str, body: str):
+    cursor.execute('SELECT id FROM search_documents WHERE kind = ? AND ref = ?', (kind, ref))
+    row = cursor.fetchone()
+    if row is None:
+        cursor.execute('INSERT INTO search_documents (kind, ref) VALUES (?, ?)', (kind, ref))
+        document_id = cursor.lastrowid
+    else:
+        document_id = row['id']
+        cursor.execute('DELETE FROM search_index WHERE rowid = ?', (document_id,))
+    cursor.execute('INSERT INTO search_index (rowid, title, body) VALUES (?, ?, ?)', (document_id, title, body))
+
+def _remove_search_documents(cursor, kind: str, where: str, params: tuple):
+    """Drop the documents of one kind whose ref matches where"""
+    matching = f'SELECT id FROM search_documents WHERE kind = ? AND ({where})'
+    cursor.execute(f'DELETE FROM search_index WHERE rowid IN ({matching})', (kind,) + params)
+    cursor.execute(f'DELETE FROM search_documents WHERE id IN ({matching})', (kind,) + params)
+
+def index_page_for_search(cursor, page: Page):
+    _index_search_document(cursor, 'page', page.id, page.title or '', _page_search_body(page))
+
+def _note_title(note_path: str) -> str:
+    return os.path.basename(note_path)[:-3]
+
+def index_note_for_search(note_path: str, content: str):
+    """Add or replace a note (path relative to NOTES_DIR) in the search index"""
+    conn = get_db_connection()
+    _index_search_document(conn.cursor(), 'note', note_path, _note_title(note_path), content)
+    _commit(conn)
+
+def remove_notes_from_search(item_path: str, folder: bool = False):
+    """Drop a note, or every note under a folder, from the search index"""
+    conn = get_db_connection()
+    if folder:
+        prefix = os.path.join(item_path, '').replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        _remove_search_documents(conn.cursor(), 'note', "ref LIKE ? ESCAPE '\\'", (prefix + '%',))
+    else:
+        _remove_search_documents(conn.cursor(), 'note', 'ref = ?', (item_path,))
+    _commit(conn)
+
+def rebuild_search_index(cursor) -> tuple:
+    """Index every page and every note from scratch; returns (pages, notes)"""
+    cursor.execute('DELETE FROM search_index')
+    cursor.execute('DELETE FROM search_documents')
+    pages = _load_pages_by_query(cursor, '1', ())
+    for page in pages:
+        index_page_for_search(cursor, page)
+    notes = 0
+    for folder, _, files in os.walk(NOTES_DIR):
+        for name in files:
+            if not name.endswith('.md'):
+                continue
+            full_path = os.path.join(folder, name)
+            try:
+                with open(full_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Skipping {full_path} in search index: {e}")
+                continue
+            note_path = os.path.relpath(full_path, NOTES_DIR)
+            _index_search_document(cursor, 'note', note_path, _note_title(note_path), content)
+            notes += 1
+    return len(pages), notes
+
+def _search_match_expression(query: str) -> Optional[str]:
+    """An FTS5 query matching every word of query as a prefix, or None if it has no words"""
+    terms = re.findall(r'\w+', query)
+    return ' '.join(f'"{term}"*' for term in terms) or None
+
+def _render_highlight(text: str) -> str:
+    return html.escape(text or '').replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+def search_documents(query: str, kind: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """Best-ranked pages and notes for query, titles weighted above bodies, with highlighted HTML snippets"""
+    match = _search_match_expression(query)
+    if match is None:
         return []
+    cursor = get_db_connection().cursor()
+    cursor.execute(f'''
+        SELECT d.kind, d.ref,
+               highlight(search_index, 0, ?, ?) AS title,
+               snippet(search_index, 1, ?, ?, '…', 16) AS snippet
+        FROM search_index JOIN search_documents d ON d.id = search_index.rowid
+        WHERE search_index MATCH ? {'AND d.kind = ?' if kind else ''}
+        ORDER BY bm25(search_index, 10.0, 1.0)
+        LIMIT ?
+    ''', (_MARK_START, _MARK_END, _MARK_START, _MARK_END, match) + ((kind,) if kind else ()) + (limit,))
+    return [{'type': row['kind'], 'id': row['ref'], 'title': _render_highlight(row['title']),
+             'snippet': _render_highlight(row['snippet'])} for row in cursor.fetchall()]
+
+@app.cli.command('reindex-search')
+def reindex_search_command():
+    """Rebuild the search index, e.g. after notes were edited outside the app"""
+    conn = get_db_connection()
+    pages, notes = rebuild_search_index(conn.cursor())
+    _commit(conn)
+    print(f"Indexed {pages} pages and {notes} notes")
+
+# Initialize database on startup
+init_database()
+release_db_connection()
 
 @app.route('/')
 def index():
-    data = load_data()
-    return render_template('index.html', data=data)
+    recent_pages = load_recent_pages(12)
+    if not recent_pages:
+        create_default_page()
+        recent_pages = load_recent_pages(12)
+    return render_template('index.html', recent_pages=recent_pages)
 
 @app.route('/page/<page_id>')
 def view_page(page_id):
-    data = load_data()
-    if page_id not in data.pages:
+    page = load_page(page_id)
+    if page is None:
         return redirect(url_for('index'))
     
-    page = data.pages[page_id]
-    databases = [data.databases[db_id] for db_id in page.databases if db_id in data.databases] if page.databases else []
+    databases = [database for database in map(load_database, page.databases) if database is not None]
     
     # Get hierarchy for breadcrumb
-    hierarchy_response = get_page_hierarchy(page_id)
-    hierarchy_data = json.loads(hierarchy_response.get_data(as_text=True))
-    hierarchy = hierarchy_data.get('hierarchy', []) if hierarchy_data.get('success') else []
+    hierarchy = load_hierarchy(page_id)
     
-    return render_template('page.html', page=page, databases=databases, data=data, hierarchy=hierarchy)
+    return render_template('page.html', page=page, databases=databases, hierarchy=hierarchy)
 
 @app.route('/calendar')
 def calendar_view():
-    data = load_data()
-    calendar_items = []
-    all_completion_logs = {}
-    for page in data.pages.values():
-        date_prop = get_date_property(page)
-        all_completion_logs[page.id] = [asdict(log) for log in data.completion_logs.get(page.id, [])]
-        db_color = data.databases[page.parent_database_id].color if page.parent_database_id in data.databases else '#3b82f6'
-        if date_prop and date_prop.value:
-            try:
-                if isinstance(date_prop.value, dict):
-                    is_repeating = date_prop.value.get('repetition', False)
-                    start_date = date_prop.value.get('start_date')
-                    start_time = date_prop.value.get('start_time') or None
-                    end_time = date_prop.value.get('end_time') or None
-                    if is_repeating and start_date:
-                        repetition_config = date_prop.value.get('repetition_config', {})
-                        repetition_type = date_prop.value.get('repetition_type', 'daily')
-                        dates = calculate_repetition_dates(start_date, repetition_type, repetition_config)
-                        for date in dates:
-                            calendar_items.append({
-                                'page': asdict(page),
-                                'date': date,
-                                'start_time': start_time,
-                                'end_time': end_time,
-                                'is_repeating': True,
-                                'is_all_day': not start_time,
-                                'database_color': db_color
-                            })
-                    elif start_date:
-                        calendar_items.append({
-                            'page': asdict(page),
-                            'date': start_date,
-                            'start_time': start_time,
-                            'end_time': end_time,
-                            'is_repeating': False,
-                            'is_all_day': not start_time,
-                            'database_color': db_color
-                        })
-                elif isinstance(date_prop.value, str):
-                    calendar_items.append({
-                        'page': asdict(page),
-                        'date': date_prop.value,
-                        'start_time': None,
-                        'end_time': None,
-                        'is_repeating': False,
-                        'is_all_day': True,
-                        'database_color': db_color
-                    })
-            except Exception as e:
-                print(f"Could not process date for page {page.id}: {e}")
-                continue
-    return render_template('calendar.html', calendar_items=calendar_items, data=data, completion_logs=all_completion_logs)
+    # Only the database filter tree is rendered inline; occurrences are fetched per visible range
+    return render_template('calendar.html', database_filters=load_database_filters())
+
+# Calendar occurrences are sent as positional tuples; each page is sent once in 'pages'
+CALENDAR_OCCURRENCE_FIELDS = ['page_id', 'date', 'start_time', 'end_time', 'is_repeating', 'completed']
+
+def _parse_calendar_window():
+    """Read ?start=&end= (ISO dates or datetimes) as YYYY-MM-DD strings; returns (start, end, error)"""
+    start = (request.args.get('start') or '')[:10]
+    end = (request.args.get('end') or '')[:10]
+    try:
+        start_day = datetime.strptime(start, '%Y-%m-%d')
+        end_day = datetime.strptime(end, '%Y-%m-%d')
+    except ValueError:
+        return None, None, 'start and end must be ISO dates'
+    if end_day <= start_day:
+        return None, None, 'end must be after start'
+    if (end_day - start_day).days > MAX_CALENDAR_WINDOW_DAYS:
+        return None, None, f'Window cannot exceed {MAX_CALENDAR_WINDOW_DAYS} days'
+    return start, end, None
+
+@app.route('/api/calendar/occurrences')
+def api_calendar_occurrences():
+    """Occurrences of dated tasks and their completion state inside the visible window [start, end), normalized by page"""
+    window_start, window_end, error = _parse_calendar_window()
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+
+    ensure_occurrences_through(max(window_end, _occurrence_horizon()))
+    cursor = get_db_connection().cursor()
+    cursor.execute(f'''
+        SELECT o.page_id, o.date, o.start_time, o.end_time, o.is_repeating,
+               {_COMPLETED_SQL} AS completed
+        FROM occurrences o
+        {_COMPLETION_JOINS}
+        WHERE o.date >= ? AND o.date < ?
+        ORDER BY o.date, o.start_time
+    ''', (window_start, window_end))
+    rows = cursor.fetchall()
+
+    pages = load_pages(list({row['page_id'] for row in rows}))
+    database_colors = {}
+    occurrences = []
+    for row in rows:
+        page = pages.get(row['page_id'])
+        if page is None:
+            continue
+        if page.parent_database_id and page.parent_database_id not in database_colors:
+            database = load_database(page.parent_database_id)
+            database_colors[page.parent_database_id] = database.color if database else '#3b82f6'
+        occurrences.append((row['page_id'], row['date'], row['start_time'], row['end_time'],
+                            bool(row['is_repeating']), bool(row['completed'])))
+    return jsonify({
+        'success': True,
+        'start': window_start,
+        'end': window_end,
+        'fields': CALENDAR_OCCURRENCE_FIELDS,
+        'occurrences': occurrences,
+        'pages': {page_id: asdict(page) for page_id, page in pages.items()},
+        'database_colors': database_colors
+    })
 
 @app.route('/api/create_database', methods=['POST'])
+@atomic
 def create_database():
     database_id = str(uuid.uuid4())
-    page_id = request.json.get('page_id')
-    name = request.json.get('name', 'Untitled Database')
-    properties = request.json.get('properties', {})
-    color = request.json.get('color', '#3b82f6')
+    page_id = request_payload().get('page_id')
+    name = request_payload().get('name', 'Untitled Database')
+    properties = request_payload().get('properties', {})
+    color = request_payload().get('color', '#3b82f6')
     current_time = datetime.now().isoformat()
     
     # Convert properties to Property objects
@@ -679,21 +2268,17 @@ def create_database():
     
     # Update parent page
     if page_id:
-        data = load_data()
-        if page_id in data.pages:
-            if data.pages[page_id].databases is None:
-                data.pages[page_id].databases = []
-            data.pages[page_id].databases.append(database_id)
-            save_page(data.pages[page_id])
+        link_database_to_page(page_id, database_id)
     
     return jsonify({'success': True, 'database_id': database_id})
 
 @app.route('/api/create_page', methods=['POST'])
+@atomic
 def create_page():
     page_id = str(uuid.uuid4())
-    database_id = request.json.get('database_id')
-    title = request.json.get('title', 'Untitled')
-    properties = request.json.get('properties', {})
+    database_id = request_payload().get('database_id')
+    title = request_payload().get('title', 'Untitled')
+    properties = request_payload().get('properties', {})
     current_time = datetime.now().isoformat()
     
     # Convert properties to Property objects
@@ -734,25 +2319,21 @@ def create_page():
     
     # Update parent database
     if database_id:
-        data = load_data()
-        if database_id in data.databases:
-            if data.databases[database_id].pages is None:
-                data.databases[database_id].pages = []
-            data.databases[database_id].pages.append(page_id)
-            save_database(data.databases[database_id])
+        link_page_to_database(database_id, page_id)
     
     return jsonify({'success': True, 'page_id': page_id})
 
 @app.route('/api/update_page', methods=['POST'])
+@atomic
 def update_page():
-    page_id = request.json.get('page_id')
-    updates = request.json.get('updates', {})
+    page_id = request_payload().get('page_id')
+    updates = request_payload().get('updates', {})
     
-    data = load_data()
-    if page_id not in data.pages:
+    page = load_page(page_id)
+    if page is None:
         return jsonify({'success': False, 'error': 'Page not found'})
-    
-    page = data.pages[page_id]
+    # Edit a private copy; save_page publishes it to the cache after the commit
+    page = deepcopy(page)
     
     # Update properties
     if 'properties' in updates:
@@ -780,13 +2361,13 @@ def update_page():
     return jsonify({'success': True})
 
 @app.route('/api/mark_completed', methods=['POST'])
+@atomic
 def mark_completed():
-    page_id = request.json.get('page_id')
-    date = request.json.get('date')
-    completed = request.json.get('completed', True)
+    page_id = request_payload().get('page_id')
+    date = request_payload().get('date')
+    completed = request_payload().get('completed', True)
     
-    data = load_data()
-    if page_id not in data.pages:
+    if not page_exists(page_id):
         return jsonify({'success': False, 'error': 'Page not found'})
     
     # Create completion log
@@ -799,15 +2380,90 @@ def mark_completed():
     save_completion_log(page_id, log)
     return jsonify({'success': True})
 
+@app.route('/api/mark_completed/batch', methods=['POST'])
+@atomic
+def mark_completed_batch():
+    """Record many {page_id, date, completed[, timestamp]} entries in one transaction, e.g. an offline sync"""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    entries = payload.get('entries')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'success': False, 'error': 'entries must be a non-empty list'}), 400
+    
+    now = datetime.now().isoformat()
+    logs = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get('page_id'):
+            return jsonify({'success': False, 'error': 'Each entry needs a page_id'}), 400
+        try:
+            date = datetime.strptime(str(entry.get('date', ''))[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return jsonify({'success': False, 'error': f"Invalid date for page {entry['page_id']}"}), 400
+        logs.append((entry['page_id'], CompletionLog(
+            date=date,
+            completed=bool(entry.get('completed', True)),
+            timestamp=entry.get('timestamp') or now
+        )))
+    
+    missing = missing_page_ids(list(dict.fromkeys(page_id for page_id, _ in logs)))
+    if missing:
+        return jsonify({'success': False, 'error': 'Page not found', 'page_ids': missing}), 404
+    
+    save_completion_logs(logs)
+    return jsonify({'success': True, 'saved': len(logs)})
+
+@app.route('/api/completion_logs')
+def get_completion_logs():
+    """Completion logs for ?page_ids=a,b,... with start <= date < end"""
+    page_ids = list(dict.fromkeys(page_id for page_id in (request.args.get('page_ids') or '').split(',') if page_id))
+    if not page_ids:
+        return jsonify({'success': False, 'error': 'page_ids is required'}), 400
+    start, end, error = _parse_calendar_window()
+    if error:
+        return jsonify({'success': False, 'error': error}), 400
+    
+    logs = load_completion_logs_range(page_ids, start, end)
+    return jsonify({
+        'success': True,
+        'start': start,
+        'end': end,
+        'completion_logs': {page_id: [asdict(log) for log in page_logs] for page_id, page_logs in logs.items()}
+    })
+
+@app.route('/api/task_stats')
+def get_task_stats():
+    """Completion statistics for ?page_ids=a,b,...: counts, rates and current/longest streak"""
+    page_ids = list(dict.fromkeys(page_id for page_id in (request.args.get('page_ids') or '').split(',') if page_id))
+    if not page_ids:
+        return jsonify({'success': False, 'error': 'page_ids is required'}), 400
+    
+    stored = load_task_stats(page_ids)
+    as_of = date_type.today().isoformat()
+    stats = {}
+    for page_id in page_ids:
+        page_stats = stored.get(page_id) or _empty_task_stats(as_of)
+        stats[page_id] = {
+            'expected': page_stats['expected_count'],
+            'completed': page_stats['completed_count'],
+            'completion_rate': page_stats['completed_count'] / page_stats['expected_count'] if page_stats['expected_count'] else None,
+            'current_streak': page_stats['current_streak'],
+            'longest_streak': page_stats['longest_streak'],
+            'last_completed_date': page_stats['last_completed_date'],
+            'month': page_stats['month'],
+            'month_expected': page_stats['month_expected'],
+            'month_completed': page_stats['month_completed'],
+            'month_completion_rate': page_stats['month_completed'] / page_stats['month_expected'] if page_stats['month_expected'] else None
+        }
+    return jsonify({'success': True, 'as_of': as_of, 'stats': stats})
+
 @app.route('/api/get_page_data/<page_id>')
 def get_page_data(page_id):
-    data = load_data()
-    
-    if page_id not in data.pages:
+    page = load_page(page_id)
+    if page is None:
         return jsonify({'success': False, 'error': 'Page not found'})
     
-    page = data.pages[page_id]
-    completion_logs = data.completion_logs.get(page_id, [])
+    completion_logs = load_completion_logs(page_id)
     
     return jsonify({
         'success': True,
@@ -817,32 +2473,67 @@ def get_page_data(page_id):
 
 @app.route('/api/get_database_data/<database_id>')
 def get_database_data(database_id):
-    data = load_data()
-    
-    if database_id not in data.databases:
+    # ?include_pages=false returns only the definition, for the property editors
+    if request.args.get('include_pages', 'true').lower() == 'false':
+        database, pages = load_database(database_id), []
+    else:
+        database, pages = load_database_with_pages(database_id)
+    if database is None:
         return jsonify({'success': False, 'error': 'Database not found'})
     
-    database = data.databases[database_id]
-    pages = [data.pages[page_id] for page_id in database.pages if page_id in data.pages] if database.pages else []
-    
     return jsonify({
         'success': True,
         'database': asdict(database, dict_factory=lambda x: {k: v for (k, v) in x if v is not None}),
         'pages': [asdict(page, dict_factory=lambda x: {k: v for (k, v) in x if v is not None}) for page in pages]
     })
 
+@app.route('/api/query_database/<database_id>', methods=['POST'])
+def query_database(database_id):
+    """Filtered, sorted window of a database's pages: {filters, sorts, offset, limit}"""
+    database = load_database(database_id)
+    if database is None:
+        return jsonify({'success': False, 'error': 'Database not found'}), 404
+    
+    payload = request.get_json(silent=True) or {}
+    filters = payload.get('filters', [])
+    sorts = payload.get('sorts', [])
+    try:
+        offset = int(payload.get('offset', 0))
+        limit = int(payload.get('limit', QUERY_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'error': 'offset and limit must be integers'}), 400
+    if offset < 0 or not 1 <= limit <= MAX_QUERY_PAGE_SIZE:
+        return jsonify({'success': False, 'error': f'offset must be >= 0 and limit between 1 and {MAX_QUERY_PAGE_SIZE}'}), 400
+    if not isinstance(filters, list) or not isinstance(sorts, list):
+        return jsonify({'success': False, 'error': 'filters and sorts must be lists'}), 400
+    
+    try:
+        pages, total, next_offset = query_database_pages(database, filters, sorts, offset, limit)
+    except QueryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    # The definition is sent without its full list of page ids
+    return jsonify({
+        'success': True,
+        'database': asdict(replace(database, pages=None), dict_factory=lambda x: {k: v for (k, v) in x if v is not None}),
+        'pages': [asdict(page, dict_factory=lambda x: {k: v for (k, v) in x if v is not None}) for page in pages],
+        'total': total,
+        'next_offset': next_offset
+    })
+
 @app.route('/api/update_database', methods=['POST'])
+@atomic
 def update_database():
-    database_id = request.json.get('database_id')
-    name = request.json.get('name')
-    properties = request.json.get('properties', {})
-    color = request.json.get('color', '#3b82f6')
+    database_id = request_payload().get('database_id')
+    name = request_payload().get('name')
+    properties = request_payload().get('properties', {})
+    color = request_payload().get('color', '#3b82f6')
     
-    data = load_data()
-    if database_id not in data.databases:
+    database = load_database(database_id)
+    if database is None:
         return jsonify({'success': False, 'error': 'Database not found'})
-    
-    database = data.databases[database_id]
+    # Edit a private copy; save_database publishes it to the cache after the commit
+    database = deepcopy(database)
     
     # Update database name
     database.name = name
@@ -876,212 +2567,175 @@ def update_database():
     save_database(database)
     return jsonify({'success': True})
 
-def recursively_delete_page_and_contents(page_id: str, data: NotionData):
+def delete_subtree(root_type: str, root_id: str) -> List[Dict[str, Any]]:
     """
-    Deletes a page and all its sub-content (databases, which in turn contain pages)
-    recursively from the database.
+    Delete a page or database together with everything nested under it
+    (page -> databases -> pages -> ...) using set-based statements.
+    Returns how many pages and databases were removed at each depth.
     """
-    # Base case: if page doesn't exist in our loaded data, assume it's already deleted.
-    if page_id not in data.pages:
-        return
+    conn = get_db_connection()
+    cursor = conn.cursor()
 
-    page_to_delete = data.pages[page_id]
-
-    # Recursively delete child databases and their contents
-    if page_to_delete.databases:
-        # Iterate over a copy since the underlying data will be modified
-        for db_id in list(page_to_delete.databases):
-            if db_id in data.databases:
-                db_to_delete = data.databases[db_id]
-                # Recursively delete all pages within this database
-                if db_to_delete.pages:
-                    for sub_page_id in list(db_to_delete.pages):
-                        recursively_delete_page_and_contents(sub_page_id, data)
-                
-                # After deleting all sub-pages, delete the database itself
-                delete_database_from_db(db_id)
-                # Remove from in-memory model to prevent issues
-                if db_id in data.databases:
-                    del data.databases[db_id]
-
-    # Finally, delete the page itself
-    delete_page_from_db(page_id)
-    # Remove from in-memory model
-    if page_id in data.pages:
-        del data.pages[page_id]
+    # Collect the subtree once, following parent_page_id / parent_database_id. Every node has
+    # a single parent, so a walk down from the root can only come back through the root itself
+    # (a cyclic chain); the root is never re-entered and UNION drops any repeated row.
+    cursor.execute('CREATE TEMP TABLE IF NOT EXISTS subtree_nodes (id TEXT PRIMARY KEY, type TEXT NOT NULL, depth INTEGER NOT NULL)')
+    cursor.execute('DELETE FROM subtree_nodes')
+    cursor.execute('''
+        WITH RECURSIVE subtree(id, type, depth) AS (
+            SELECT ?1, ?2, 0
+            UNION
+            SELECT COALESCE(d.id, p.id),
+                   CASE WHEN s.type = 'page' THEN 'database' ELSE 'page' END,
+                   s.depth + 1
+            FROM subtree s
+            LEFT JOIN databases d ON s.type = 'page' AND d.parent_page_id = s.id
+            LEFT JOIN pages p ON s.type = 'database' AND p.parent_database_id = s.id
+            WHERE COALESCE(d.id, p.id) IS NOT NULL AND COALESCE(d.id, p.id) != ?1
+        )
+        INSERT OR IGNORE INTO subtree_nodes (id, type, depth) SELECT id, type, depth FROM subtree
+    ''', (root_id, root_type))
+
+    cursor.execute('''
+        SELECT depth,
+               SUM(type = 'page') AS pages,
+               SUM(type = 'database') AS databases
+        FROM subtree_nodes GROUP BY depth ORDER BY depth
+    ''')
+    levels = [{'depth': row['depth'], 'pages': row['pages'], 'databases': row['databases']} for row in cursor.fetchall()]
+
+    cursor.execute("SELECT id FROM subtree_nodes WHERE type = 'page'")
+    page_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT id FROM subtree_nodes WHERE type = 'database'")
+    database_ids = [row[0] for row in cursor.fetchall()]
+
+    subtree_pages = "SELECT id FROM subtree_nodes WHERE type = 'page'"
+    subtree_databases = "SELECT id FROM subtree_nodes WHERE type = 'database'"
+    cursor.execute('DELETE FROM properties WHERE (owner_id, owner_type) IN (SELECT id, type FROM subtree_nodes)')
+    cursor.execute(f'DELETE FROM select_options WHERE database_id IN ({subtree_databases})')
+    cursor.execute(f'DELETE FROM page_databases WHERE page_id IN ({subtree_pages}) OR database_id IN ({subtree_databases})')
+    cursor.execute(f'DELETE FROM database_pages WHERE database_id IN ({subtree_databases}) OR page_id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM completion_logs WHERE page_id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM occurrences WHERE page_id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM occurrence_series WHERE page_id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM task_stats WHERE page_id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM completion_months WHERE page_id IN ({subtree_pages})')
+    cursor.execute('DELETE FROM hierarchy_closure WHERE descendant_id IN (SELECT id FROM subtree_nodes)')
+    _remove_search_documents(cursor, 'page', f'ref IN ({subtree_pages})', ())
+    cursor.execute(f'''
+        DELETE FROM blocks
+        WHERE (type = 'page' AND entity_id IN ({subtree_pages}))
+           OR (type = 'database' AND entity_id IN ({subtree_databases}))
+    ''')
+    cursor.execute(f'DELETE FROM pages WHERE id IN ({subtree_pages})')
+    cursor.execute(f'DELETE FROM databases WHERE id IN ({subtree_databases})')
+    cursor.execute('DELETE FROM subtree_nodes')
+
+    _after_commit(workspace_cache.remove_subtree, page_ids, database_ids)
+    _commit(conn)
+    return levels
 
 @app.route('/api/delete_database', methods=['POST'])
+@atomic
 def delete_database():
-    database_id = request.json.get('database_id')
+    database_id = request_payload().get('database_id')
     
-    data = load_data()
-    if database_id not in data.databases:
+    database = load_database(database_id)
+    if database is None:
         return jsonify({'success': False, 'error': 'Database not found'})
     
-    database = data.databases[database_id]
-    
-    # Delete all pages in the database recursively
-    if database.pages:
-        for page_id in list(database.pages): # Iterate over a copy
-            recursively_delete_page_and_contents(page_id, data)
-    
     # Remove database from parent page's list
-    if database.parent_page_id and database.parent_page_id in data.pages:
-        parent_page = data.pages[database.parent_page_id]
-        if parent_page.databases and database_id in parent_page.databases:
-            parent_page.databases.remove(database_id)
-            save_page(parent_page)
+    if database.parent_page_id and page_exists(database.parent_page_id):
+        unlink_database_from_page(database.parent_page_id, database_id)
     
-    # Delete the database itself
-    delete_database_from_db(database_id)
+    # Delete the database and all pages nested under it
+    deleted = delete_subtree('database', database_id)
     
-    return jsonify({'success': True})
+    return jsonify({'success': True, 'deleted': deleted})
 
 @app.route('/api/delete_page', methods=['POST'])
+@atomic
 def delete_page():
-    page_id = request.json.get('page_id')
+    page_id = request_payload().get('page_id')
     
-    data = load_data()
-    if page_id not in data.pages:
+    page = load_page(page_id)
+    if page is None:
         return jsonify({'success': False, 'error': 'Page not found'})
     
-    page = data.pages[page_id]
-    
     # Remove page from parent database's list of pages
-    if page.parent_database_id and page.parent_database_id in data.databases:
-        parent_db = data.databases[page.parent_database_id]
-        if parent_db.pages and page_id in parent_db.pages:
-            parent_db.pages.remove(page_id)
-            save_database(parent_db)
-    
-    # Call the recursive deletion function
-    recursively_delete_page_and_contents(page_id, data)
+    if page.parent_database_id and database_exists(page.parent_database_id):
+        unlink_page_from_database(page.parent_database_id, page_id)
+    
+    # Delete the page and all databases/pages nested under it
+    deleted = delete_subtree('page', page_id)
+    
+    return jsonify({'success': True, 'deleted': deleted})
+
+@app.route('/api/tree')
+def get_tree():
+    """One level of the sidebar tree: ?parent_type=root|page|database&parent_id=&cursor=&limit="""
+    parent_type = request.args.get('parent_type', 'root')
+    parent_id = request.args.get('parent_id')
+    if parent_type not in ('root', 'page', 'database'):
+        return jsonify({'success': False, 'error': 'parent_type must be root, page or database'}), 400
+    if parent_type != 'root' and not parent_id:
+        return jsonify({'success': False, 'error': 'parent_id is required'}), 400
+    try:
+        after = int(request.args.get('cursor') or 0)
+        limit = min(max(int(request.args.get('limit') or TREE_PAGE_SIZE), 1), MAX_TREE_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'cursor and limit must be integers'}), 400
     
-    return jsonify({'success': True})
+    items, next_cursor = load_tree_children(parent_type, parent_id, after, limit)
+    return jsonify({'success': True, 'items': items, 'next_cursor': next_cursor})
 
 @app.route('/api/get_page_hierarchy/<page_id>')
 def get_page_hierarchy(page_id):
     """Get the complete hierarchy path for a page"""
-    data = load_data()
-    
-    if page_id not in data.pages:
+    if not page_exists(page_id):
         return jsonify({'success': False, 'error': 'Page not found'})
     
-    hierarchy = []
-    current_page = data.pages[page_id]
-    
-    # Build hierarchy from current page up to root
-    while current_page:
-        hierarchy.insert(0, {
-            'id': current_page.id,
-            'title': current_page.title,
-            'type': 'page'
-        })
-        
-        # Find parent database
-        if current_page.parent_database_id:
-            parent_db = data.databases.get(current_page.parent_database_id)
-            if parent_db:
-                hierarchy.insert(0, {
-                    'id': parent_db.id,
-                    'title': parent_db.name,
-                    'type': 'database'
-                })
-                
-                # Find parent page of the database
-                if parent_db.parent_page_id:
-                    current_page = data.pages.get(parent_db.parent_page_id)
-                else:
-                    current_page = None
-            else:
-                current_page = None
-        else:
-            current_page = None
-    
     return jsonify({
         'success': True,
-        'hierarchy': hierarchy
+        'hierarchy': load_hierarchy(page_id)
     })
 
 @app.route('/api/get_database_hierarchy/<database_id>')
 def get_database_hierarchy(database_id):
     """Get the complete hierarchy path for a database"""
-    data = load_data()
-    
-    if database_id not in data.databases:
+    if not database_exists(database_id):
         return jsonify({'success': False, 'error': 'Database not found'})
     
-    hierarchy = []
-    current_database = data.databases[database_id]
-    
-    # Build hierarchy from current database up to root
-    while current_database:
-        hierarchy.insert(0, {
-            'id': current_database.id,
-            'title': current_database.name,
-            'type': 'database'
-        })
-        
-        # Find parent page
-        if current_database.parent_page_id:
-            parent_page = data.pages.get(current_database.parent_page_id)
-            if parent_page:
-                hierarchy.insert(0, {
-                    'id': parent_page.id,
-                    'title': parent_page.title,
-                    'type': 'page'
-                })
-                
-                # Find parent database of the page
-                if parent_page.parent_database_id:
-                    current_database = data.databases.get(parent_page.parent_database_id)
-                else:
-                    current_database = None
-            else:
-                current_database = None
-        else:
-            current_database = None
-    
     return jsonify({
         'success': True,
-        'hierarchy': hierarchy
+        'hierarchy': load_hierarchy(database_id)
     })
 
 @app.route('/api/navigate_to_page/<page_id>')
 def navigate_to_page(page_id):
     """Navigate to a page, showing its databases and hierarchy"""
-    data = load_data()
-    
-    if page_id not in data.pages:
+    page = load_page(page_id)
+    if page is None:
         return redirect(url_for('index'))
     
-    page = data.pages[page_id]
-    databases = [data.databases[db_id] for db_id in page.databases if db_id in data.databases] if page.databases else []
+    databases = [database for database in map(load_database, page.databases) if database is not None]
     
     # Get hierarchy for breadcrumb
-    hierarchy_response = get_page_hierarchy(page_id)
-    hierarchy_data = json.loads(hierarchy_response.get_data(as_text=True))
-    hierarchy = hierarchy_data.get('hierarchy', []) if hierarchy_data.get('success') else []
+    hierarchy = load_hierarchy(page_id)
     
-    return render_template('page.html', page=page, databases=databases, data=data, hierarchy=hierarchy)
+    return render_template('page.html', page=page, databases=databases, hierarchy=hierarchy)
 
 @app.route('/api/navigate_to_database/<database_id>')
 def navigate_to_database(database_id):
     """Navigate to a database, showing its pages and hierarchy"""
-    data = load_data()
-    
-    if database_id not in data.databases:
+    database, pages = load_database_with_pages(database_id)
+    if database is None:
         return redirect(url_for('index'))
     
-    database = data.databases[database_id]
-    pages = [data.pages[page_id] for page_id in database.pages if page_id in data.pages] if database.pages else []
-    
     # Get hierarchy for breadcrumb
-    hierarchy_response = get_database_hierarchy(database_id)
-    hierarchy_data = json.loads(hierarchy_response.get_data(as_text=True))
-    hierarchy = hierarchy_data.get('hierarchy', []) if hierarchy_data.get('success') else []
+    hierarchy = load_hierarchy(database_id)
     
-    return render_template('database.html', database=database, pages=pages, data=data, hierarchy=hierarchy, render_property_value=render_property_value)
+    return render_template('database.html', database=database, pages=pages, hierarchy=hierarchy, render_property_value=render_property_value)
 
 def render_property_value(pageProp, propDef):
     if propDef.type == 'text':
@@ -1103,41 +2757,137 @@ def render_property_value(pageProp, propDef):
     else:
         return f"<span>{pageProp.value or ''}</span>"
 
+def _validate_property_value(property_type: str, value, options: List[SelectOption]) -> Optional[str]:
+    """Why value cannot be stored in a property of this type, or None if it can"""
+    if value is None or value == '':
+        return None
+    if property_type in ('text', 'rich_text'):
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return 'Expected a string'
+    elif property_type == 'number':
+        try:
+            if isinstance(value, bool):
+                raise ValueError
+            float(value)
+        except (TypeError, ValueError):
+            return 'Expected a number'
+    elif property_type in ('select', 'status'):
+        if options and value not in {opt.id for opt in options}:
+            return 'Unknown option'
+    elif property_type == 'date':
+        start_date = value.get('start_date') if isinstance(value, dict) else value
+        if not isinstance(start_date, str):
+            return 'Expected a date'
+        try:
+            date_type.fromisoformat(start_date[:10])
+        except ValueError:
+            return 'Expected an ISO date'
+    return None
+
 @app.route('/api/update_property', methods=['POST'])
+@atomic
 def update_property():
-    page_id = request.json.get('page_id')
-    property_id = request.json.get('property_id')
-    value = request.json.get('value')
-    property_type = request.json.get('type', 'text')
+    page_id = request_payload().get('page_id')
+    property_id = request_payload().get('property_id')
+    value = request_payload().get('value')
+    property_type = request_payload().get('type', 'text')
     
-    data = load_data()
-    if page_id not in data.pages:
+    page_found, definition = load_property_definition(page_id, property_id)
+    if not page_found:
         return jsonify({'success': False, 'error': 'Page not found'}), 404
     
-    page = data.pages[page_id]
-    
-    # Update the property
-    if property_id in page.properties:
-        if property_type == 'rich_text':
-            page.properties[property_id].value = ''
-            page.properties[property_id].rich_text_content = value if value is not None else ''
-        else:
-            page.properties[property_id].value = value
-            page.properties[property_id].rich_text_content = None
-        page.updated_at = datetime.now().isoformat()
-    else:
-        page.properties[property_id] = Property(
-            id=property_id,
-            name=property_id,
-            type=property_type,
-            value='' if property_type == 'rich_text' else value,
-            rich_text_content=value if property_type == 'rich_text' else None
-        )
-        page.updated_at = datetime.now().isoformat()
-    
-    save_page(page)
+    # The parent database's definition decides the type; free-standing properties use the one sent
+    if definition is not None:
+        property_type = definition.type
+    error = _validate_property_value(property_type, value, definition.options if definition else [])
+    if error:
+        return jsonify({'success': False, 'error': f'Invalid value for {property_id}: {error}'}), 400
+    
+    prop = Property(
+        id=property_id,
+        name=definition.name if definition else property_id,
+        type=property_type,
+        value='' if property_type == 'rich_text' else value,
+        rich_text_content=(value if value is not None else '') if property_type == 'rich_text' else None
+    )
+    save_page_property(page_id, prop, datetime.now().isoformat())
     return jsonify({'success': True})
 
+# --- Batch mutations ---
+# /api/batch replays an ordered list of mutations through the regular route
+# handlers, inside one unit of work. Handlers read their input through
+# request_payload(), which returns the operation's params while it is applied.
+
+BATCH_OPERATIONS = {
+    'create_page': 'create_page',
+    'update_page': 'update_page',
+    'delete_page': 'delete_page',
+    'create_database': 'create_database',
+    'update_database': 'update_database',
+    'delete_database': 'delete_database',
+    'update_property': 'update_property',
+    'mark_completed': 'mark_completed',
+}
+
+class BatchAborted(Exception):
+    """Raised to roll back a batch when one of its operations fails"""
+    def __init__(self, index: int, result: Dict[str, Any], status: int):
+        super().__init__(result.get('error'))
+        self.index = index
+        self.result = result
+        self.status = status
+
+def request_payload() -> Dict[str, Any]:
+    """The JSON body of the current request, or the params of the batch operation being applied"""
+    if 'batch_params' in g:
+        return g.batch_params
+    return request.json
+
+def _resolve_batch_refs(params: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Replace '$<index>.<key>' values with a field of an earlier result, e.g. '$0.page_id'"""
+    resolved = {}
+    for key, value in params.items():
+        if isinstance(value, str) and value.startswith('$') and '.' in value:
+            index, _, field = value[1:].partition('.')
+            if index.isdigit() and int(index) < len(results) and field in results[int(index)]:
+                value = results[int(index)][field]
+        resolved[key] = value
+    return resolved
+
+@atomic
+def _apply_batch(operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    for index, operation in enumerate(operations):
+        g.batch_params = _resolve_batch_refs(operation.get('params') or {}, results)
+        try:
+            response = app.make_response(app.view_functions[BATCH_OPERATIONS[operation['op']]]())
+        finally:
+            g.pop('batch_params', None)
+        result = response.get_json()
+        if response.status_code >= 400 or not result.get('success'):
+            raise BatchAborted(index, result, response.status_code if response.status_code >= 400 else 400)
+        results.append(result)
+    return results
+
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Apply [{op, params}, ...] in order and in one transaction; any failure rolls back the whole batch"""
+    payload = request.get_json(silent=True) or {}
+    if not isinstance(payload, dict):
+        return jsonify({'success': False, 'error': 'Request body must be a JSON object'}), 400
+    operations = payload.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'success': False, 'error': 'operations must be a non-empty list'}), 400
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPERATIONS:
+            return jsonify({'success': False, 'error': f'Unknown operation at index {index}', 'index': index}), 400
+    
+    try:
+        results = _apply_batch(operations)
+    except BatchAborted as e:
+        return jsonify({'success': False, 'error': e.result.get('error'), 'index': e.index, 'result': e.result}), e.status
+    return jsonify({'success': True, 'results': results})
+
 # --- Notes Functionality (Updated) ---
 
 def _is_safe_path(path):
@@ -1151,48 +2901,107 @@ def _is_safe_path(path):
     # Check if the resolved path is a sub-path of the main notes directory
     return os.path.commonpath([abs_path, abs_notes_dir]) == abs_notes_dir
 
+class NotesTreeCache:
+    """
+    In-memory listing of NOTES_DIR, one entry per folder keyed by the folder's mtime.
+    A folder is re-scanned with os.scandir only when its mtime changed, so listing an
+    unchanged tree costs one stat per folder. Editing a note leaves its folder's mtime
+    alone, so the notes endpoints also invalidate the folders they touch.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._folders: Dict[str, tuple] = {}  # absolute folder path -> (mtime_ns, items)
+        self._lock = threading.Lock()
+
+    def _scan(self, folder: str) -> List[Dict[str, Any]]:
+        items = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                relative_path = os.path.relpath(entry.path, NOTES_DIR)
+                if entry.is_dir():
+                    items.append({'name': entry.name, 'path': relative_path, 'type': 'folder'})
+                elif entry.is_file() and entry.name.endswith('.md'):
+                    items.append({
+                        'name': entry.name[:-3], # Remove .md extension for display
+                        'path': relative_path,
+                        'type': 'file',
+                        'updated_at': datetime.fromtimestamp(entry.stat().st_mtime).isoformat()
+                    })
+        # Sort folders first, then files, both alphabetically
+        items.sort(key=lambda x: (0 if x['type'] == 'folder' else 1, x['name'].lower()))
+        return items
+
+    def list_folder(self, folder: str) -> List[Dict[str, Any]]:
+        """The direct children of a folder; subfolders come without their 'children'"""
+        folder = os.path.abspath(folder)
+        try:
+            # Stat before scanning: a change during the scan leaves a newer mtime to notice next time
+            mtime = os.stat(folder).st_mtime_ns
+            with self._lock:
+                cached = self._folders.get(folder)
+                if cached is not None and cached[0] == mtime:
+                    self.hits += 1
+                    return cached[1]
+                self.misses += 1
+            items = self._scan(folder)
+        except OSError as e:
+            print(f"Error listing notes and folders in {folder}: {e}")
+            self.invalidate(os.path.relpath(folder, NOTES_DIR), recursive=True)
+            return []
+        with self._lock:
+            self._folders[folder] = (mtime, items)
+        return items
+
+    def tree(self, folder: str) -> List[Dict[str, Any]]:
+        """The items of a folder with every subfolder's 'children' filled in"""
+        items = []
+        for item in self.list_folder(folder):
+            if item['type'] == 'folder':
+                item = dict(item, children=self.tree(os.path.join(NOTES_DIR, item['path'])))
+            items.append(item)
+        return items
+
+    def invalidate(self, relative_path: str = '', recursive: bool = False):
+        """Forget a folder (relative to NOTES_DIR), and with recursive=True everything cached below it"""
+        folder = os.path.abspath(os.path.join(NOTES_DIR, relative_path))
+        with self._lock:
+            self._folders.pop(folder, None)
+            if recursive:
+                for cached in [f for f in self._folders if f.startswith(folder + os.sep)]:
+                    del self._folders[cached]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'folders': len(self._folders), 'hits': self.hits, 'misses': self.misses}
+
+notes_tree_cache = NotesTreeCache()
+
 def list_notes_and_folders(base_path):
     """
     Lists notes (.md files) and subfolders recursively from a given base path.
     Returns a list of dictionaries with 'name', 'path', 'type' ('file' or 'folder').
     Paths are relative to NOTES_DIR.
     """
-    items = []
-    try:
-        for entry in os.listdir(base_path):
-            full_path = os.path.join(base_path, entry)
-            relative_path = os.path.relpath(full_path, NOTES_DIR)
-            
-            if os.path.isdir(full_path):
-                items.append({
-                    'name': entry,
-                    'path': relative_path,
-                    'type': 'folder',
-                    'children': list_notes_and_folders(full_path) # Recursively list children
-                })
-            elif os.path.isfile(full_path) and entry.endswith('.md'):
-                items.append({
-                    'name': entry[:-3], # Remove .md extension for display
-                    'path': relative_path,
-                    'type': 'file',
-                    'updated_at': datetime.fromtimestamp(os.path.getmtime(full_path)).isoformat()
-                })
-    except Exception as e:
-        print(f"Error listing notes and folders in {base_path}: {e}")
-    
-    # Sort folders first, then files, both alphabetically
-    items.sort(key=lambda x: (0 if x['type'] == 'folder' else 1, x['name'].lower()))
-    return items
+    return notes_tree_cache.tree(base_path)
 
 @app.route('/notes')
 def notes_view():
     """Renders the notes page."""
-    data = load_data()
-    return render_template('notes.html', data=data)
+    return render_template('notes.html')
 
 @app.route('/api/notes/list', methods=['GET'])
 def api_list_notes():
-    """API endpoint to list all notes and folders."""
+    """API endpoint to list all notes and folders, or with ?path= only the direct children of one folder."""
+    folder_path = request.args.get('path')
+    if folder_path:
+        if not _is_safe_path(folder_path):
+            return jsonify({'success': False, 'error': 'Invalid path provided'}), 400
+        full_path = os.path.join(NOTES_DIR, folder_path)
+        if not os.path.isdir(full_path):
+            return jsonify({'success': False, 'error': 'Folder not found'}), 404
+        return jsonify({'success': True, 'path': folder_path, 'notes_tree': notes_tree_cache.list_folder(full_path)})
+    
     notes_tree = list_notes_and_folders(NOTES_DIR)
     return jsonify({'success': True, 'notes_tree': notes_tree})
 
@@ -1246,11 +3055,13 @@ def api_create_note_or_folder():
             os.makedirs(os.path.dirname(full_path), exist_ok=True)
             with open(full_path, 'w', encoding='utf-8') as f:
                 f.write('') # Create empty file
+            index_note_for_search(os.path.relpath(full_path, NOTES_DIR), '')
         elif item_type == 'folder':
             os.makedirs(full_path)
         else:
             return jsonify({'success': False, 'error': 'Invalid item type'}), 400
         
+        notes_tree_cache.invalidate(os.path.dirname(final_relative_path))
         return jsonify({'success': True, 'path': os.path.relpath(full_path, NOTES_DIR)})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1275,6 +3086,8 @@ def api_update_note():
     try:
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        index_note_for_search(os.path.relpath(full_path, NOTES_DIR), content)
+        notes_tree_cache.invalidate(os.path.dirname(note_path))
         return jsonify({'success': True, 'path': note_path})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1301,14 +3114,18 @@ def api_delete_note_or_folder():
             if not os.path.isfile(full_path):
                 return jsonify({'success': False, 'error': 'Path is a directory, not a file'}), 400
             os.remove(full_path)
+            remove_notes_from_search(os.path.relpath(full_path, NOTES_DIR))
         elif item_type == 'folder':
             if not os.path.isdir(full_path):
                 return jsonify({'success': False, 'error': 'Path is a file, not a directory'}), 400
             # Use shutil.rmtree to delete folders that may not be empty
             shutil.rmtree(full_path)
+            remove_notes_from_search(os.path.relpath(full_path, NOTES_DIR), folder=True)
+            notes_tree_cache.invalidate(item_path, recursive=True)
         else:
             return jsonify({'success': False, 'error': 'Invalid item type'}), 400
         
+        notes_tree_cache.invalidate(os.path.dirname(item_path))
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1318,10 +3135,35 @@ def settings_view():
     settings = {
         'Flask Secret Key': os.getenv('FLASK_SECRET_KEY', ''),
         'Timezone': os.getenv('TIMEZONE', ''),
-        'App Public URL': os.getenv('APP_PUBLIC_URL', '')
+        'App Public URL': os.getenv('APP_PUBLIC_URL', ''),
+        'Workspace Cache': 'enabled' if workspace_cache.enabled else 'disabled'
     }
-    data = load_data()
-    return render_template('settings.html', settings=settings, data=data)
+    return render_template('settings.html', settings=settings)
+
+@app.route('/api/search')
+def api_search():
+    """Ranked search over pages and notes: ?q=&type=page|note&limit=; each word matches as a prefix"""
+    query = request.args.get('q', '')
+    kind = request.args.get('type') or None
+    if kind not in (None, 'page', 'note'):
+        return jsonify({'success': False, 'error': 'type must be page or note'}), 400
+    try:
+        limit = min(max(int(request.args.get('limit') or SEARCH_RESULT_LIMIT), 1), MAX_SEARCH_RESULT_LIMIT)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'limit must be an integer'}), 400
+    
+    results = search_documents(query, kind, limit)
+    for result in results:
+        if result['type'] == 'page':
+            result['url'] = url_for('view_page', page_id=result['id'])
+        else:
+            result['url'] = url_for('notes_view', path=result['id'])
+    return jsonify({'success': True, 'results': results})
+
+@app.route('/api/cache/stats')
+def api_cache_stats():
+    """Hit/miss counters for the in-memory workspace cache and notes tree"""
+    return jsonify({'success': True, 'cache': workspace_cache.stats(), 'notes_tree': notes_tree_cache.stats()})
 
 # --- Note Sharing Table ---
 
@@ -1334,8 +3176,7 @@ def create_note_share(note_path, permission='view'):
         INSERT INTO note_shares (share_id, note_path, permission, created_at)
         VALUES (?, ?, ?, ?)
     ''', (share_id, note_path, permission, created_at))
-    conn.commit()
-    conn.close()
+    _commit(conn)
     return share_id
 
 def get_note_share_by_path(note_path):
@@ -1343,7 +3184,6 @@ def get_note_share_by_path(note_path):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM note_shares WHERE note_path = ?', (note_path,))
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 def get_note_share_by_id(share_id):
@@ -1351,15 +3191,13 @@ def get_note_share_by_id(share_id):
     cursor = conn.cursor()
     cursor.execute('SELECT * FROM note_shares WHERE share_id = ?', (share_id,))
     row = cursor.fetchone()
-    conn.close()
     return dict(row) if row else None
 
 def update_note_share_permission(share_id, permission):
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute('UPDATE note_shares SET permission = ? WHERE share_id = ?', (permission, share_id))
-    conn.commit()
-    conn.close()
+    _commit(conn)
 
 # --- Note Sharing API Endpoints ---
 @app.route('/api/notes/share/create', methods=['POST'])
@@ -1435,6 +3273,8 @@ def api_update_shared_note_content():
     try:
         with open(full_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        index_note_for_search(os.path.relpath(full_path, NOTES_DIR), content)
+        notes_tree_cache.invalidate(os.path.dirname(note_path))
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
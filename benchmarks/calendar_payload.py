@@ -0,0 +1,92 @@
+"""
+Calendar payload size and serialization time on a synthetic workspace of
+repeating tasks. The normalized response (one dict per page, occurrences as
+tuples referencing it) is compared with the shape it replaced, where every
+occurrence carried its own asdict(page) copy:
+
+    python benchmarks/calendar_payload.py
+"""
+import statistics
+import time
+from dataclasses import asdict
+
+from harness import load_app
+
+TASKS = 300
+RUNS = 5
+WINDOWS = [('month', '2026-03-01', '2026-04-01'), ('quarter', '2026-01-01', '2026-04-01')]
+
+
+def seed(client):
+    root = client.post('/api/create_page', json={'title': 'Bench', 'properties': {}}).get_json()['page_id']
+    properties = {
+        'due': {'name': 'Due', 'type': 'date'},
+        'status': {'name': 'Status', 'type': 'select'},
+        'points': {'name': 'Points', 'type': 'number'},
+        'notes': {'name': 'Notes', 'type': 'rich_text'},
+    }
+    database_id = client.post('/api/create_database', json={
+        'page_id': root, 'name': 'Habits', 'properties': properties
+    }).get_json()['database_id']
+    for index in range(TASKS):
+        repetition = ('daily', {'interval': 1}) if index % 2 else ('weekly', {'days_of_week': [0, 2, 4]})
+        client.post('/api/create_page', json={'database_id': database_id, 'title': f'Task {index}', 'properties': {
+            'due': {'name': 'Due', 'type': 'date', 'value': {
+                'start_date': '2026-01-01', 'end_date': '2026-12-31', 'repetition': True,
+                'repetition_type': repetition[0], 'repetition_config': repetition[1],
+            }},
+            'points': {'name': 'Points', 'type': 'number', 'value': index},
+            'notes': {'name': 'Notes', 'type': 'rich_text', 'value': '', 'rich_text_content': '<p>' + 'note ' * 40 + '</p>'},
+        }})
+
+
+def per_occurrence_payload(app, response):
+    """The pre-normalization shape: a full page copy in every occurrence"""
+    pages = {page_id: app.load_page(page_id) for page_id in response['pages']}
+    occurrences = []
+    for values in response['occurrences']:
+        row = dict(zip(response['fields'], values))
+        page = pages[row['page_id']]
+        occurrences.append({
+            'page': asdict(page),
+            'date': row['date'],
+            'start_time': row['start_time'],
+            'end_time': row['end_time'],
+            'is_repeating': row['is_repeating'],
+            'is_all_day': not row['start_time'],
+            'database_color': response['database_colors'].get(page.parent_database_id, '#3b82f6'),
+            'completed': row['completed'],
+        })
+    return {'success': True, 'start': response['start'], 'end': response['end'], 'occurrences': occurrences}
+
+
+def normalized_payload(app, response):
+    """The current shape, rebuilt from the same pages so both sides pay for asdict()"""
+    pages = {page_id: app.load_page(page_id) for page_id in response['pages']}
+    return dict(response, pages={page_id: asdict(page) for page_id, page in pages.items()})
+
+
+def measure(app, build, response):
+    timings = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        body = app.app.json.dumps(build(app, response))
+        timings.append(time.perf_counter() - started)
+    return len(body.encode()), statistics.median(timings)
+
+
+def main():
+    app = load_app()
+    client = app.app.test_client()
+    seed(client)
+    print(f'{TASKS} repeating tasks, median of {RUNS} runs (build + JSON encode)')
+    for label, start, end in WINDOWS:
+        response = client.get(f'/api/calendar/occurrences?start={start}&end={end}').get_json()
+        for shape, build in (('per-occurrence', per_occurrence_payload), ('normalized', normalized_payload)):
+            size, seconds = measure(app, build, response)
+            print(f'{label:<8} {shape:<15} {len(response["occurrences"]):6} occurrences  '
+                  f'{size / 1024:9.1f} KiB  {seconds * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
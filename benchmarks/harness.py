@@ -0,0 +1,61 @@
+"""
+Shared setup for the benchmark scripts. load_app() imports app.py, from the working
+tree or as of a git revision, inside a scratch directory so the run never touches
+./data. Compare a change with the code before it by running a script twice,
+with --rev <commit> and with --rev <commit>^.
+"""
+import argparse
+import importlib.util
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every SQL statement run on a connection opened after load_app(trace=True)
+STATEMENTS = []
+
+
+def parse_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--rev', help='benchmark app.py as of this git revision instead of the working tree')
+    return parser.parse_args()
+
+
+def _traced(connect):
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(STATEMENTS.append)
+        return conn
+    return traced_connect
+
+
+def load_app(rev=None, trace=False):
+    """Import app.py (at rev, if given) against an empty workspace; the process stays in that directory"""
+    workdir = tempfile.mkdtemp(prefix='notion-bench-')
+    path = os.path.join(workdir, 'app.py')
+    if rev:
+        source = subprocess.run(['git', 'show', f'{rev}:app.py'], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        with open(path, 'w') as f:
+            f.write(source)
+    else:
+        with open(os.path.join(ROOT, 'app.py')) as src, open(path, 'w') as f:
+            f.write(src.read())
+    os.symlink(os.path.join(ROOT, 'templates'), os.path.join(workdir, 'templates'))
+
+    if trace:
+        sqlite3.connect = _traced(sqlite3.connect)
+    os.chdir(workdir)  # DATA_DIR is relative to the working directory
+    spec = importlib.util.spec_from_file_location('app', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['app'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
@@ -0,0 +1,49 @@
+"""
+Occurrences of 10k repeating tasks in a one-month window: the day-by-day
+baseline (kept as the oracle in tests/test_recurrence.py) expands each series
+in full and filters it, RecurrenceRule jumps straight into the window. The
+baseline's total is lower by the monthly occurrences it used to drop.
+
+    python benchmarks/recurrence.py
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+from harness import ROOT, load_app
+
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+from test_recurrence import baseline_repetition_dates  # noqa: E402
+
+TASKS = 10000
+WINDOW = (date(2025, 10, 1), date(2025, 11, 1))
+RULES = [
+    ('daily', {'interval': 1}),
+    ('weekly', {'days_of_week': [0, 2, 4]}),
+    ('custom', {'days_of_week': [1, 3]}),
+    ('monthly', {}),
+]
+
+
+def timed(label, occurrences_of):
+    starts = [(date(2025, 1, 1) + timedelta(days=i % 300)).isoformat() for i in range(TASKS)]
+    started = time.perf_counter()
+    total = sum(len(occurrences_of(start, *RULES[i % len(RULES)])) for i, start in enumerate(starts))
+    print(f'{label:<34} {time.perf_counter() - started:6.2f} s  ({total} occurrences)')
+
+
+def main():
+    app = load_app()
+    window_start, window_end = (day.isoformat() for day in WINDOW)
+    print(f'{TASKS} repeating tasks, window {window_start} .. {window_end}')
+    timed('baseline, full expansion', lambda start, kind, config: [
+        day for day in baseline_repetition_dates(start, kind, config) if window_start <= day < window_end])
+    timed('calculate_repetition_dates, full', lambda start, kind, config: [
+        day for day in app.calculate_repetition_dates(start, kind, config) if window_start <= day < window_end])
+    timed('RecurrenceRule, windowed', lambda start, kind, config: list(
+        app.RecurrenceRule.from_date_value(start, kind, config).occurrences(*WINDOW)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Commits and latency per API mutation on a 300-row database. With
+synchronous=FULL every commit is one WAL sync, so commits per call is the
+fsync count. To isolate the single-transaction handlers, run it at the commit
+that added unit_of_work() and at its parent:
+
+    python benchmarks/transactions.py --rev <commit>
+    python benchmarks/transactions.py --rev <commit>^
+"""
+import os
+import statistics
+import time
+
+from harness import STATEMENTS, load_app, parse_args, percentile
+
+ROWS = 300
+CALLS = 100
+
+
+def seed(client):
+    root = client.post('/api/create_page', json={'title': 'Bench', 'properties': {}}).get_json()['page_id']
+    properties = {
+        'status': {'name': 'Status', 'type': 'select'},
+        'due': {'name': 'Due', 'type': 'date'},
+        'notes': {'name': 'Notes', 'type': 'text'},
+    }
+    database_id = client.post('/api/create_database', json={
+        'page_id': root, 'name': 'Rows', 'properties': properties
+    }).get_json()['database_id']
+    for index in range(ROWS):
+        client.post('/api/create_page', json={'database_id': database_id, 'title': f'Row {index}', 'properties': {
+            'notes': {'name': 'Notes', 'type': 'text', 'value': f'row {index}'},
+        }})
+    return database_id
+
+
+def measure(label, calls):
+    commits, latencies = [], []
+    for call in calls:
+        STATEMENTS.clear()
+        started = time.perf_counter()
+        response = call()
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200 and response.get_json()['success'], response.get_json()
+        commits.append(STATEMENTS.count('COMMIT'))
+    print(f'{label:<14} {statistics.mean(commits):5.1f} commits  '
+          f'mean {statistics.mean(latencies) * 1000:7.2f} ms  p95 {percentile(latencies, 0.95) * 1000:7.2f} ms')
+
+
+def main():
+    args = parse_args(__doc__)
+    os.environ.setdefault('SQLITE_SYNCHRONOUS', 'FULL')
+    app = load_app(args.rev, trace=True)
+    client = app.app.test_client()
+    database_id = seed(client)
+
+    created = []
+
+    def create():
+        response = client.post('/api/create_page', json={'database_id': database_id, 'title': 'New', 'properties': {}})
+        created.append(response.get_json().get('page_id'))
+        return response
+
+    print(f'app.py at {args.rev or "working tree"}, {CALLS} calls each')
+    measure('create_page', [create] * CALLS)
+    measure('update_page', [lambda page_id=page_id: client.post('/api/update_page', json={
+        'page_id': page_id, 'updates': {'title': 'Renamed'}}) for page_id in created])
+    measure('mark_completed', [lambda page_id=page_id: client.post('/api/mark_completed', json={
+        'page_id': page_id, 'date': '2026-01-01', 'completed': True}) for page_id in created])
+    measure('delete_page', [lambda page_id=page_id: client.post('/api/delete_page', json={
+        'page_id': page_id}) for page_id in created])
+
+
+if __name__ == '__main__':
+    main()
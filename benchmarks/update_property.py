@@ -0,0 +1,56 @@
+"""
+Latency of /api/update_property on a 30-property page in a 200-row database,
+with the workspace cache on and off. To compare the single-row patch with the
+load-and-save_page path it replaced, run it at that commit and at its parent:
+
+    python benchmarks/update_property.py --rev <commit>
+    python benchmarks/update_property.py --rev <commit>^
+"""
+import statistics
+import time
+
+from harness import load_app, parse_args, percentile
+
+ROWS = 200
+PROPERTIES = 30
+EDITS = 500
+
+
+def seed(client):
+    root = client.post('/api/create_page', json={'title': 'Bench', 'properties': {}}).get_json()['page_id']
+    properties = {f'p{i}': {'name': f'P{i}', 'type': 'text'} for i in range(PROPERTIES)}
+    database_id = client.post('/api/create_database', json={
+        'page_id': root, 'name': 'Rows', 'properties': properties
+    }).get_json()['database_id']
+    values = {key: dict(prop, value='v' * 40) for key, prop in properties.items()}
+    for index in range(ROWS):
+        client.post('/api/create_page', json={'database_id': database_id, 'title': f'Row {index}', 'properties': values})
+    return client.post('/api/create_page', json={
+        'database_id': database_id, 'title': 'Target', 'properties': values
+    }).get_json()['page_id']
+
+
+def main():
+    args = parse_args(__doc__)
+    app = load_app(args.rev)
+    client = app.app.test_client()
+    page_id = seed(client)
+
+    print(f'app.py at {args.rev or "working tree"}, {EDITS} edits')
+    for cached in (True, False):
+        app.workspace_cache.enabled = cached
+        app.workspace_cache.invalidate()
+        latencies = []
+        for index in range(EDITS):
+            started = time.perf_counter()
+            response = client.post('/api/update_property', json={
+                'page_id': page_id, 'property_id': f'p{index % PROPERTIES}', 'value': f'edit {index}', 'type': 'text'
+            })
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200 and response.get_json()['success'], response.get_json()
+        print(f'cache {"on " if cached else "off"}  median {statistics.median(latencies) * 1000:6.2f} ms  '
+              f'p95 {percentile(latencies, 0.95) * 1000:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
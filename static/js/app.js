@@ -59,19 +59,35 @@ function loadAllDatabases() {
     });
 }
 
-function loadDatabaseData(databaseId) {
-    fetch(`/api/get_database_data/${databaseId}`)
+// Table rows are fetched from /api/query_database a slice at a time, sorted on the server
+const DATABASE_PAGE_SIZE = 100;
+const databaseSorts = {};
+
+function loadDatabaseData(databaseId, offset = 0) {
+    fetch(`/api/query_database/${databaseId}`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ sorts: databaseSorts[databaseId] || [], offset: offset, limit: DATABASE_PAGE_SIZE })
+    })
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                renderDatabaseTable(databaseId, data.pages, data.database);
+                renderDatabaseTable(databaseId, data.pages, data.database, offset > 0, data.next_offset);
             } else {
                 console.error(`Failed to load data for database ${databaseId}:`, data.error);
             }
         });
 }
 
-function renderDatabaseTable(databaseId, pages, database) {
+function sortDatabaseBy(databaseId, property) {
+    // Clicking the sorted column again flips its direction
+    const current = (databaseSorts[databaseId] || [])[0];
+    const direction = current && current.property === property && current.direction === 'asc' ? 'desc' : 'asc';
+    databaseSorts[databaseId] = [{ property: property, direction: direction }];
+    loadDatabaseData(databaseId);
+}
+
+function renderDatabaseTable(databaseId, pages, database, append = false, nextOffset = null) {
     const tableBody = document.getElementById(`databaseBody_${databaseId}`);
     if (!tableBody) return;
 
@@ -80,16 +96,24 @@ function renderDatabaseTable(databaseId, pages, database) {
     const gridTemplateColumns = `minmax(250px, 2fr) 200px repeat(${Object.keys(database.properties).length}, minmax(150px, 1fr)) 120px`;
 
     if(headerRow) {
-        let headerHTML = `<div class="table-cell table-cell-title">Title</div><div class="table-cell">Description</div>`;
+        const sort = (databaseSorts[databaseId] || [])[0];
+        const sortIcon = property => sort && sort.property === property
+            ? ` <i class="fas fa-sort-${sort.direction === 'asc' ? 'up' : 'down'}"></i>` : '';
+        let headerHTML = `<div class="table-cell table-cell-title" onclick="sortDatabaseBy('${databaseId}', 'title')" style="cursor: pointer;">Title${sortIcon('title')}</div><div class="table-cell">Description</div>`;
         Object.values(database.properties).forEach(propDef => {
-            headerHTML += `<div class="table-cell">${propDef.name}</div>`;
+            headerHTML += `<div class="table-cell" onclick="sortDatabaseBy('${databaseId}', '${propDef.id}')" style="cursor: pointer;">${propDef.name}${sortIcon(propDef.id)}</div>`;
         });
         headerHTML += `<div class="table-cell table-cell-actions">Actions</div>`;
         headerRow.innerHTML = headerHTML;
         headerRow.style.gridTemplateColumns = gridTemplateColumns;
     }
 
-    tableBody.innerHTML = '';
+    if (append) {
+        const loadMore = tableBody.querySelector('.database-load-more');
+        if (loadMore) loadMore.remove();
+    } else {
+        tableBody.innerHTML = '';
+    }
     pages.forEach(page => {
         const row = document.createElement('div');
         row.className = 'database-table-row';
@@ -148,6 +172,13 @@ function renderDatabaseTable(databaseId, pages, database) {
         row.innerHTML = rowHTML;
         tableBody.appendChild(row);
     });
+
+    if (nextOffset !== null && nextOffset !== undefined) {
+        const loadMore = document.createElement('div');
+        loadMore.className = 'database-table-row database-load-more';
+        loadMore.innerHTML = `<div class="table-cell" onclick="loadDatabaseData('${databaseId}', ${nextOffset})" style="cursor: pointer;"><i class="fas fa-chevron-down"></i> Load more</div>`;
+        tableBody.appendChild(loadMore);
+    }
 }
 
 
@@ -178,7 +209,7 @@ function editPage(pageId) {
                     alert("This page doesn't belong to a database and cannot be edited this way.");
                     return;
                 }
-                fetch(`/api/get_database_data/${page.parent_database_id}`).then(res => res.json()).then(dbData => {
+                fetch(`/api/get_database_data/${page.parent_database_id}?include_pages=false`).then(res => res.json()).then(dbData => {
                     if (dbData.success) {
                         showPageEditModal(page, dbData.database);
                     } else {
@@ -463,7 +494,7 @@ function confirmCreateDatabase() {
 }
 
 function editDatabase(databaseId) {
-    fetch(`/api/get_database_data/${databaseId}`)
+    fetch(`/api/get_database_data/${databaseId}?include_pages=false`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -639,7 +670,7 @@ function removeSelectOption(button) {
 // =================================================================================
 
 function addPageToDatabase(databaseId) {
-    fetch(`/api/get_database_data/${databaseId}`)
+    fetch(`/api/get_database_data/${databaseId}?include_pages=false`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -743,7 +774,7 @@ function confirmCreatePage(databaseId, datePropIndex) {
         return;
     }
 
-    fetch(`/api/get_database_data/${databaseId}`)
+    fetch(`/api/get_database_data/${databaseId}?include_pages=false`)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
@@ -1288,6 +1319,60 @@ function deleteNoteOrFolder(itemPath, type) {
     }
 }
 
+// =================================================================================
+// BATCHED EDITS
+// =================================================================================
+// Edits queued with queueEdit() are sent together to /api/batch and applied in one
+// transaction. Each call resolves with its own operation's result; if any operation
+// fails, the whole batch is rolled back and every queued promise rejects.
+const pendingEdits = [];
+let pendingEditsTimer = null;
+const EDIT_FLUSH_DELAY = 300; // ms to wait for more edits before flushing
+
+function queueEdit(op, params) {
+    return new Promise((resolve, reject) => {
+        pendingEdits.push({ op: op, params: params, resolve: resolve, reject: reject });
+        clearTimeout(pendingEditsTimer);
+        // Failures reach each edit's own promise, so the timer-driven flush swallows them
+        pendingEditsTimer = setTimeout(() => flushEdits().catch(() => {}), EDIT_FLUSH_DELAY);
+    });
+}
+
+function flushEdits() {
+    clearTimeout(pendingEditsTimer);
+    pendingEditsTimer = null;
+    const edits = pendingEdits.splice(0, pendingEdits.length);
+    if (edits.length === 0) {
+        return Promise.resolve([]);
+    }
+
+    return fetch('/api/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ operations: edits.map(edit => ({ op: edit.op, params: edit.params })) })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || 'Batch failed');
+        }
+        edits.forEach((edit, index) => edit.resolve(data.results[index]));
+        return data.results;
+    })
+    .catch(error => {
+        edits.forEach(edit => edit.reject(error));
+        throw error;
+    });
+}
+
+// Don't lose queued edits when the user navigates away
+window.addEventListener('pagehide', () => {
+    if (pendingEdits.length === 0) return;
+    const edits = pendingEdits.splice(0, pendingEdits.length);
+    const body = JSON.stringify({ operations: edits.map(edit => ({ op: edit.op, params: edit.params })) });
+    navigator.sendBeacon('/api/batch', new Blob([body], { type: 'application/json' }));
+});
+
 // =================================================================================
 // INITIALIZATION & EVENT LISTENERS
 // =================================================================================
@@ -1314,6 +1399,9 @@ document.addEventListener('DOMContentLoaded', function() {
         listNotesAndFolders();
         document.getElementById('notesEmptyState').style.display = 'flex';
         document.getElementById('noteEditor').style.display = 'none';
+        // Search results link to /notes?path=...
+        const notePath = new URLSearchParams(window.location.search).get('path');
+        if (notePath) openNote(notePath);
     }
 });
 
@@ -1392,6 +1480,10 @@ window.removeSelectOption = removeSelectOption;
 window.toggleRepetitionOptions = toggleRepetitionOptions;
 window.updateRepetitionOptions = updateRepetitionOptions;
 
+// Batched edits
+window.queueEdit = queueEdit;
+window.flushEdits = flushEdits;
+
 // For Calendar
 window.markTaskCompleted = (pageId, date, completed) => {
     fetch('/api/mark_completed', {
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app imported against an empty workspace; DATA_DIR is relative to the working directory"""
+    os.chdir(tmp_path_factory.mktemp('workspace'))
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
@@ -0,0 +1,50 @@
+def test_batch_ops_after_a_write_do_not_reload_the_workspace(app_module, client, monkeypatch):
+    page_id = client.post('/api/create_page', json={'title': 'Batch', 'properties': {}}).get_json()['page_id']
+    database_id = client.post('/api/create_database', json={
+        'page_id': page_id, 'name': 'Items', 'properties': {}
+    }).get_json()['database_id']
+    child_id = client.post('/api/create_page', json={
+        'database_id': database_id, 'title': 'Item', 'properties': {}
+    }).get_json()['page_id']
+    app_module.load_data()  # warm the cache
+
+    def full_load():
+        raise AssertionError('batch operation reloaded the whole workspace')
+    monkeypatch.setattr(app_module, '_load_data_from_db', full_load)
+
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'update_database', 'params': {'database_id': database_id, 'name': 'Renamed', 'properties': {}}},
+        {'op': 'delete_page', 'params': {'page_id': child_id}},
+        {'op': 'delete_database', 'params': {'database_id': database_id}},
+        {'op': 'delete_page', 'params': {'page_id': page_id}},
+    ]}).get_json()
+    assert response['success'], response
+    assert not app_module.page_exists(page_id)
+
+
+def test_rolled_back_edits_never_reach_the_cache(app_module, client):
+    page_id = client.post('/api/create_page', json={'title': 'Original', 'properties': {}}).get_json()['page_id']
+    database_id = client.post('/api/create_database', json={
+        'page_id': page_id, 'name': 'Original', 'properties': {}
+    }).get_json()['database_id']
+    app_module.load_data()  # warm the cache
+
+    response = client.post('/api/batch', json={'operations': [
+        {'op': 'update_page', 'params': {'page_id': page_id, 'updates': {
+            'title': 'Edited', 'properties': {'note': {'name': 'Note', 'type': 'text', 'value': 'x'}}
+        }}},
+        {'op': 'update_database', 'params': {'database_id': database_id, 'name': 'Edited', 'properties': {}}},
+        {'op': 'delete_page', 'params': {'page_id': 'missing'}},
+    ]}).get_json()
+    assert not response['success']
+
+    cached = app_module.workspace_cache.snapshot()
+    assert cached.pages[page_id].title == 'Original'
+    assert 'note' not in cached.pages[page_id].properties
+    assert cached.databases[database_id].name == 'Original'
+
+
+def test_batch_rejects_non_object_bodies(client):
+    for kwargs in ({}, {'json': [1]}, {'data': '{', 'content_type': 'application/json'}):
+        response = client.post('/api/batch', **kwargs)
+        assert response.status_code == 400 and response.get_json()['success'] is False
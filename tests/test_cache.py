@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+from copy import deepcopy
+
+from conftest import ROOT
+
+
+def _create_database(client):
+    page_id = client.post('/api/create_page', json={'title': 'Cache', 'properties': {}}).get_json()['page_id']
+    return client.post('/api/create_database', json={
+        'page_id': page_id, 'name': 'Rows', 'properties': {}
+    }).get_json()['database_id']
+
+
+def test_saving_a_stale_database_keeps_rows_linked_since(app_module, client):
+    database_id = _create_database(client)
+    app_module.load_data()  # warm the cache
+    stale = deepcopy(app_module.load_database(database_id))
+
+    row_id = client.post('/api/create_page', json={
+        'database_id': database_id, 'title': 'Row', 'properties': {}
+    }).get_json()['page_id']
+    stale.name = 'Renamed'
+    with app_module.unit_of_work():
+        app_module.save_database(stale)
+    app_module.release_db_connection()
+
+    assert app_module.workspace_cache.snapshot().databases[database_id].pages == [row_id]
+    app_module.workspace_cache.invalidate()
+    database = app_module.load_database(database_id)
+    assert (database.name, database.pages) == ('Renamed', [row_id])
+
+
+def test_scoped_reads_load_the_cache_on_an_existing_workspace(app_module, client):
+    page_id = client.post('/api/create_page', json={'title': 'Restart', 'properties': {}}).get_json()['page_id']
+    cache = app_module.workspace_cache
+    # As after a restart: nothing loaded yet
+    cache.invalidate()
+    cache.hits = cache.misses = 0
+
+    assert client.get(f'/api/get_page_data/{page_id}').get_json()['success']
+    assert client.get(f'/api/get_page_hierarchy/{page_id}').get_json()['success']
+    stats = client.get('/api/cache/stats').get_json()['cache']
+    assert (stats['loaded'], stats['misses']) == (True, 1) and stats['hits'] >= 1
+
+
+def test_welcome_page_is_created_without_loading_the_workspace(tmp_path):
+    check = (
+        'import json, app\n'
+        'client = app.app.test_client()\n'
+        'assert client.get("/").status_code == 200\n'
+        'client.get("/")\n'
+        'titles = [row[0] for row in app.get_db_connection().execute("SELECT title FROM pages")]\n'
+        'print(json.dumps({"titles": titles, "loaded": app.workspace_cache.stats()["loaded"]}))\n'
+    )
+    result = subprocess.run([sys.executable, '-c', check], cwd=tmp_path, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    assert result.returncode == 0, result.stderr
+    checks = json.loads(result.stdout.strip().splitlines()[-1])
+    assert checks == {'titles': ['Welcome to Your Workspace'], 'loaded': False}
+
+
+def test_write_through_never_changes_objects_readers_hold(app_module, client):
+    database_id = _create_database(client)
+    page_id = client.post('/api/create_page', json={
+        'database_id': database_id, 'title': 'Held', 'properties': {}
+    }).get_json()['page_id']
+    held_page = app_module.load_page(page_id)
+    held_database = app_module.load_database(database_id)
+    held_logs = app_module.workspace_cache.snapshot().completion_logs.get(page_id, [])
+    before = (app_module.asdict(held_page), app_module.asdict(held_database), list(held_logs))
+
+    client.post('/api/update_property', json={'page_id': page_id, 'property_id': 'note', 'value': 'x', 'type': 'text'})
+    client.post('/api/mark_completed', json={'page_id': page_id, 'date': '2026-01-01', 'completed': True})
+    client.post('/api/create_page', json={'database_id': database_id, 'title': 'Sibling', 'properties': {}})
+    client.post('/api/delete_page', json={'page_id': page_id})
+
+    assert (app_module.asdict(held_page), app_module.asdict(held_database), list(held_logs)) == before
+    assert not app_module.page_exists(page_id)
+    assert len(app_module.load_database(database_id).pages) == 1
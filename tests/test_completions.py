@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'data': 'not json', 'content_type': 'application/json'},
+    {'json': ['entries']},
+    {'json': {'entries': []}},
+    {'json': {'entries': [{'date': '2026-01-01'}]}},
+    {'json': {'entries': [{'page_id': 'x', 'date': 'someday'}]}},
+])
+def test_batch_completion_rejects_bad_bodies(client, kwargs):
+    response = client.post('/api/mark_completed/batch', **kwargs)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_batch_completion_saves_entries(app_module, client):
+    page_id = client.post('/api/create_page', json={'title': 'Done', 'properties': {}}).get_json()['page_id']
+    response = client.post('/api/mark_completed/batch', json={'entries': [
+        {'page_id': page_id, 'date': '2026-01-01'},
+        {'page_id': page_id, 'date': '2026-01-02', 'completed': False},
+    ]}).get_json()
+    assert response == {'success': True, 'saved': 2}
+
+    logs = client.get(f'/api/completion_logs?page_ids={page_id}&start=2026-01-01&end=2026-01-03').get_json()
+    assert [(log['date'], log['completed']) for log in logs['completion_logs'][page_id]] == [
+        ('2026-01-01', True), ('2026-01-02', False)]
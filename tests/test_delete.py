@@ -0,0 +1,36 @@
+def _create_nested(client):
+    page_id = client.post('/api/create_page', json={'title': 'Outer', 'properties': {}}).get_json()['page_id']
+    database_id = client.post('/api/create_database', json={
+        'page_id': page_id, 'name': 'Inner', 'properties': {}
+    }).get_json()['database_id']
+    child_id = client.post('/api/create_page', json={
+        'database_id': database_id, 'title': 'Child', 'properties': {}
+    }).get_json()['page_id']
+    return page_id, database_id, child_id
+
+
+def test_delete_page_removes_subtree(app_module, client):
+    page_id, database_id, child_id = _create_nested(client)
+
+    response = client.post('/api/delete_page', json={'page_id': page_id}).get_json()
+    assert response['success']
+    assert [(level['pages'], level['databases']) for level in response['deleted']] == [(1, 0), (0, 1), (1, 0)]
+    assert not app_module.page_exists(child_id)
+    assert not app_module.database_exists(database_id)
+
+
+def test_delete_stops_at_cyclic_parent_chain(app_module, client):
+    page_id, database_id, child_id = _create_nested(client)
+    # Corrupt the tree so the outer page is nested under its own database
+    conn = app_module.get_db_connection()
+    conn.execute('UPDATE pages SET parent_database_id = ? WHERE id = ?', (database_id, page_id))
+    conn.commit()
+    app_module.release_db_connection()
+    app_module.workspace_cache.invalidate()
+
+    response = client.post('/api/delete_page', json={'page_id': page_id}).get_json()
+    assert response['success']
+    assert sum(level['pages'] for level in response['deleted']) == 2
+    assert sum(level['databases'] for level in response['deleted']) == 1
+    assert not app_module.page_exists(page_id)
+    assert not app_module.page_exists(child_id)
@@ -0,0 +1,32 @@
+def _count_full_load_queries(app_module):
+    conn = app_module.get_db_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        data = app_module._load_data_from_db()
+    finally:
+        conn.set_trace_callback(None)
+        app_module.release_db_connection()
+    return len(statements), data
+
+
+def _add_databases(client, count):
+    page_id = client.post('/api/create_page', json={'title': 'Grow', 'properties': {}}).get_json()['page_id']
+    for index in range(count):
+        database_id = client.post('/api/create_database', json={'page_id': page_id, 'name': f'Db {index}', 'properties': {
+            'status': {'name': 'Status', 'type': 'select'},
+            'stage': {'name': 'Stage', 'type': 'select'},
+        }}).get_json()['database_id']
+        client.post('/api/create_page', json={'database_id': database_id, 'title': f'Row {index}', 'properties': {}})
+
+
+def test_full_load_query_count_does_not_grow_with_workspace(app_module, client):
+    _add_databases(client, 1)
+    queries, _ = _count_full_load_queries(app_module)
+
+    _add_databases(client, 20)
+    grown_queries, data = _count_full_load_queries(app_module)
+
+    assert grown_queries == queries
+    selects = [p for database in data.databases.values() for p in database.properties.values() if p.type == 'select']
+    assert len(selects) >= 42 and all(p.options for p in selects)
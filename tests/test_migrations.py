@@ -0,0 +1,88 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import date, timedelta
+
+from conftest import ROOT
+
+# The schema as created by the first release, before PRAGMA user_version was tracked
+BASELINE_SCHEMA = '''
+CREATE TABLE pages (id TEXT PRIMARY KEY, title TEXT NOT NULL, parent_database_id TEXT, created_at TEXT, updated_at TEXT);
+CREATE TABLE databases (id TEXT PRIMARY KEY, name TEXT NOT NULL, parent_page_id TEXT, created_at TEXT, updated_at TEXT,
+                        color TEXT DEFAULT '#3b82f6');
+CREATE TABLE properties (id TEXT, owner_id TEXT NOT NULL, owner_type TEXT NOT NULL, name TEXT NOT NULL, type TEXT NOT NULL,
+                         value TEXT, rich_text_content TEXT, PRIMARY KEY (id, owner_id));
+CREATE TABLE select_options (id TEXT PRIMARY KEY, property_id TEXT NOT NULL, database_id TEXT NOT NULL,
+                             name TEXT NOT NULL, color TEXT NOT NULL);
+CREATE TABLE blocks (id TEXT PRIMARY KEY, type TEXT NOT NULL, content TEXT NOT NULL, parent_id TEXT, children TEXT);
+CREATE TABLE page_databases (page_id TEXT, database_id TEXT, PRIMARY KEY (page_id, database_id));
+CREATE TABLE database_pages (database_id TEXT, page_id TEXT, PRIMARY KEY (database_id, page_id));
+CREATE TABLE completion_logs (page_id TEXT, date TEXT, completed INTEGER, timestamp TEXT, PRIMARY KEY (page_id, date));
+CREATE TABLE note_shares (share_id TEXT PRIMARY KEY, note_path TEXT NOT NULL, permission TEXT NOT NULL, created_at TEXT);
+'''
+
+UPGRADE_CHECK = '''
+import json, app
+print(json.dumps({
+    'version': app.get_db_connection().execute('PRAGMA user_version').fetchone()[0],
+    'schema_version': app.SCHEMA_VERSION,
+    'stats': app.load_task_stats(['daily', 'later']),
+    'later_stats': app.load_task_stats(['later'], as_of=(app.date_type.today() + app.timedelta(days=7)).isoformat()),
+    'hierarchy': [node['id'] for node in app.load_hierarchy('daily')],
+    'search': [result['id'] for result in app.search_documents('groceries', None, 10)],
+}))
+'''
+
+
+def _date_value(start_date, repeating):
+    value = {'start_date': start_date}
+    if repeating:
+        value.update(repetition=True, repetition_type='daily', repetition_config={'interval': 1})
+    return json.dumps(value)
+
+
+def _make_baseline_workspace(root):
+    os.makedirs(os.path.join(root, 'data', 'notes'))
+    with open(os.path.join(root, 'data', 'notes', 'list.md'), 'w', encoding='utf-8') as f:
+        f.write('buy groceries')
+
+    today = date.today()
+    conn = sqlite3.connect(os.path.join(root, 'data', 'notion_data.db'))
+    conn.executescript(BASELINE_SCHEMA)
+    conn.execute("INSERT INTO pages VALUES ('root', 'Root', NULL, '2024-01-01', '2024-01-01')")
+    conn.execute("INSERT INTO databases VALUES ('tasks', 'Tasks', 'root', '2024-01-01', '2024-01-01', '#3b82f6')")
+    conn.execute("INSERT INTO page_databases VALUES ('root', 'tasks')")
+    conn.execute("INSERT INTO properties VALUES ('due', 'tasks', 'database', 'Due', 'date', NULL, NULL)")
+    for page_id, start, repeating in [('daily', today - timedelta(days=9), True),
+                                      ('later', today + timedelta(days=5), True)]:
+        conn.execute("INSERT INTO pages VALUES (?, ?, 'tasks', '2024-01-01', '2024-01-01')", (page_id, page_id))
+        conn.execute("INSERT INTO database_pages VALUES ('tasks', ?)", (page_id,))
+        conn.execute("INSERT INTO properties VALUES ('due', ?, 'page', 'Due', 'date', ?, NULL)",
+                     (page_id, _date_value(start.isoformat(), repeating)))
+    conn.execute("INSERT INTO completion_logs VALUES ('daily', ?, 1, '2024-01-01T00:00:00')",
+                 ((today - timedelta(days=1)).isoformat(),))
+    conn.commit()
+    conn.close()
+
+
+def test_upgrade_from_baseline(tmp_path):
+    _make_baseline_workspace(tmp_path)
+    result = subprocess.run([sys.executable, '-c', UPGRADE_CHECK], cwd=tmp_path, capture_output=True, text=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    assert result.returncode == 0, result.stderr
+    checks = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert checks['version'] == checks['schema_version']
+    daily = checks['stats']['daily']
+    assert (daily['expected_count'], daily['completed_count'], daily['pending']) == (10, 1, 1)
+    assert 'later' not in checks['stats']
+    assert checks['later_stats']['later']['expected_count'] == 3
+    assert checks['hierarchy'] == ['root', 'tasks', 'daily']
+    assert checks['search'] == ['list.md']
+
+
+def test_fresh_install_is_current(app_module):
+    conn = app_module.get_db_connection()
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == app_module.SCHEMA_VERSION
@@ -0,0 +1,43 @@
+import pytest
+
+# Each hot lookup and the index it must be served by
+HOT_QUERIES = [
+    ('SELECT * FROM properties WHERE owner_id = ? AND owner_type = ?', 2, 'idx_properties_owner'),
+    ('SELECT * FROM select_options WHERE database_id = ?', 1, 'idx_select_options_database'),
+    ('SELECT * FROM note_shares WHERE note_path = ?', 1, 'idx_note_shares_note_path'),
+    ('SELECT * FROM pages WHERE parent_database_id = ?', 1, 'idx_pages_parent_database'),
+    ('SELECT * FROM databases WHERE parent_page_id = ?', 1, 'idx_databases_parent_page'),
+    ('SELECT page_id FROM database_pages WHERE database_id = ? ORDER BY position', 1, 'idx_database_pages_position'),
+    ('SELECT database_id FROM page_databases WHERE page_id = ? ORDER BY position', 1, 'idx_page_databases_position'),
+    ('SELECT * FROM database_pages WHERE page_id = ?', 1, 'idx_database_pages_page'),
+    ('SELECT * FROM page_databases WHERE database_id = ?', 1, 'idx_page_databases_database'),
+    ('SELECT * FROM blocks WHERE type = ? AND entity_id = ?', 2, 'idx_blocks_entity'),
+    ('SELECT * FROM blocks WHERE parent_id = ?', 1, 'idx_blocks_parent'),
+    ('SELECT * FROM occurrences WHERE date >= ? AND date <= ?', 2, 'idx_occurrences_date'),
+    ('SELECT * FROM occurrence_series WHERE materialized_until < ?', 1, 'idx_occurrence_series_until'),
+    ('SELECT * FROM hierarchy_closure WHERE ancestor_id = ? ORDER BY depth', 1, 'idx_hierarchy_closure_ancestor'),
+    ('SELECT * FROM pages ORDER BY updated_at DESC LIMIT ?', 1, 'idx_pages_updated_at'),
+]
+
+
+def _plan(app_module, sql, arity):
+    conn = app_module.get_db_connection()
+    try:
+        rows = conn.execute(f'EXPLAIN QUERY PLAN {sql}', ('x',) * arity).fetchall()
+    finally:
+        app_module.release_db_connection()
+    return [row['detail'] for row in rows]
+
+
+@pytest.mark.parametrize('sql, arity, index', HOT_QUERIES)
+def test_hot_query_uses_index(app_module, sql, arity, index):
+    plan = _plan(app_module, sql, arity)
+    assert any(f'INDEX {index}' in step for step in plan), plan
+    assert not any('USE TEMP B-TREE' in step for step in plan), plan
+
+
+@pytest.mark.parametrize('table', ['pages', 'databases', 'task_stats', 'completion_logs'])
+def test_lookup_by_id_uses_primary_key(app_module, table):
+    column = 'page_id' if table in ('task_stats', 'completion_logs') else 'id'
+    plan = _plan(app_module, f'SELECT * FROM {table} WHERE {column} = ?', 1)
+    assert any('USING INDEX sqlite_autoindex' in step or 'PRIMARY KEY' in step for step in plan), plan
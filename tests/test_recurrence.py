@@ -0,0 +1,135 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+
+def baseline_repetition_dates(start_date, repetition_type, repetition_config):
+    """calculate_repetition_dates as it was before RecurrenceRule: day-by-day stepping, kept as an oracle"""
+    try:
+        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+        end_date = repetition_config.get('end_date')
+        if end_date:
+            end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        else:
+            end = start + timedelta(days=365)
+
+        dates = []
+
+        if repetition_type == 'daily':
+            interval = repetition_config.get('interval', 1)
+            current = start
+            while current <= end:
+                dates.append(current.date().isoformat())
+                current += timedelta(days=interval)
+
+        elif repetition_type == 'weekly':
+            days_of_week = repetition_config.get('days_of_week', [start.weekday()])
+            current = start
+            while current <= end:
+                if current.weekday() in days_of_week:
+                    dates.append(current.date().isoformat())
+                current += timedelta(days=1)
+
+        elif repetition_type == 'monthly':
+            interval = repetition_config.get('interval', 1)
+            day = repetition_config.get('day', start.day)
+            current = start
+            while current <= end:
+                try:
+                    d = current.replace(day=day)
+                    if d >= start and d <= end:
+                        dates.append(d.date().isoformat())
+                except ValueError:
+                    pass
+                month = current.month + interval
+                year = current.year + (month - 1) // 12
+                month = (month - 1) % 12 + 1
+                current = current.replace(year=year, month=month)
+
+        elif repetition_type == 'custom':
+            days_of_week = repetition_config.get('days_of_week', [start.weekday()])
+            days_of_week = [((d - 1) % 7) for d in days_of_week]
+            current = start
+            while current <= end:
+                if current.weekday() in days_of_week:
+                    dates.append(current.date().isoformat())
+                current += timedelta(days=1)
+
+        return sorted(list(set(dates)))
+    except (ValueError, TypeError):
+        return []
+
+
+def random_rule(rng, weekly_interval=False):
+    """A random (start_date, repetition_type, repetition_config) as stored in a date property"""
+    start = date(2024, 1, 1) + timedelta(days=rng.randrange(0, 1000))
+    repetition_type = rng.choice(['daily', 'weekly', 'monthly', 'custom'])
+    config = {}
+    if rng.random() < 0.7:
+        config['end_date'] = (start + timedelta(days=rng.randrange(-5, 800))).isoformat()
+    if repetition_type in ('daily', 'monthly') or weekly_interval:
+        config['interval'] = rng.randrange(1, 5)
+    if repetition_type == 'weekly' and rng.random() < 0.8 or repetition_type == 'custom':
+        config['days_of_week'] = rng.sample(range(7), rng.randrange(0, 8))
+    if repetition_type == 'monthly' and rng.random() < 0.5:
+        config['day'] = rng.randrange(1, 32)
+    return start.isoformat(), repetition_type, config
+
+
+def _is_documented_monthly_fix(start_date, repetition_type, config, old, new):
+    if repetition_type != 'monthly':
+        return False
+    # The baseline raised (and returned []) on reaching a month shorter than the start day
+    if old == [] and new and int(start_date[8:]) > 28:
+        return True
+    # The baseline dropped the final month when the rule's day is earlier than the start day
+    end = config.get('end_date') or (date.fromisoformat(start_date) + timedelta(days=365)).isoformat()
+    return new[:-1] == old and new[-1][:7] == end[:7] and config.get('day', 32) < int(start_date[8:])
+
+
+def test_matches_baseline_except_documented_monthly_fixes(app_module):
+    rng = random.Random(1)
+    for _ in range(3000):
+        start_date, repetition_type, config = random_rule(rng)
+        old = baseline_repetition_dates(start_date, repetition_type, config)
+        new = app_module.calculate_repetition_dates(start_date, repetition_type, config)
+        if old != new:
+            assert _is_documented_monthly_fix(start_date, repetition_type, config, old, new), \
+                (start_date, repetition_type, config, old[:5], new[:5])
+
+
+def test_window_matches_full_series(app_module):
+    rng = random.Random(2)
+    for _ in range(3000):
+        start_date, repetition_type, config = random_rule(rng, weekly_interval=True)
+        if rng.random() < 0.3:
+            config['count'] = rng.randrange(1, 40)
+        rule = app_module.RecurrenceRule.from_date_value(start_date, repetition_type, config)
+        full = list(rule.occurrences())
+        window_start = date.fromisoformat(start_date) + timedelta(days=rng.randrange(-10, 400))
+        window_end = window_start + timedelta(days=rng.randrange(1, 60))
+        config['exclude_dates'] = [day.isoformat() for day in full if rng.random() < 0.1]
+        rule = app_module.RecurrenceRule.from_date_value(start_date, repetition_type, config)
+        excluded = set(config['exclude_dates'])
+        assert list(rule.occurrences(window_start, window_end)) == [
+            day for day in full if window_start <= day < window_end and day.isoformat() not in excluded
+        ], (start_date, repetition_type, config, window_start, window_end)
+
+
+@pytest.mark.parametrize('start_date, repetition_type, config, expected', [
+    # Monthly on the 31st keeps going past shorter months
+    ('2026-01-31', 'monthly', {'end_date': '2026-05-31'}, ['2026-01-31', '2026-03-31', '2026-05-31']),
+    # A day earlier than the start day keeps the final month
+    ('2026-01-20', 'monthly', {'day': 5, 'end_date': '2026-04-10'}, ['2026-02-05', '2026-03-05', '2026-04-05']),
+    # Custom without days_of_week repeats on the start's weekday (a Monday)
+    ('2026-10-05', 'custom', {'end_date': '2026-10-20'}, ['2026-10-05', '2026-10-12', '2026-10-19']),
+    # Weekly honours interval as every N weeks
+    ('2026-01-05', 'weekly', {'days_of_week': [0], 'interval': 2, 'end_date': '2026-02-28'},
+     ['2026-01-05', '2026-01-19', '2026-02-02', '2026-02-16']),
+    # Excluded dates still count towards count
+    ('2026-01-05', 'weekly', {'days_of_week': [0, 2], 'count': 5, 'exclude_dates': ['2026-01-07']},
+     ['2026-01-05', '2026-01-12', '2026-01-14', '2026-01-19']),
+])
+def test_rule_examples(app_module, start_date, repetition_type, config, expected):
+    assert app_module.calculate_repetition_dates(start_date, repetition_type, config) == expected
@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+
+def _recompute(app_module, page_id, as_of):
+    """Stats computed from scratch, without keeping the write"""
+    conn = app_module.get_db_connection()
+    try:
+        return app_module.refresh_task_stats(conn.cursor(), page_id, as_of)
+    finally:
+        conn.rollback()
+        app_module.release_db_connection()
+
+
+def _create_daily_task(client, start_date):
+    root = client.post('/api/create_page', json={'title': 'Stats', 'properties': {}}).get_json()['page_id']
+    database_id = client.post('/api/create_database', json={
+        'page_id': root, 'name': 'Habits', 'properties': {'due': {'name': 'Due', 'type': 'date'}}
+    }).get_json()['database_id']
+    return client.post('/api/create_page', json={'database_id': database_id, 'title': 'Daily', 'properties': {
+        'due': {'name': 'Due', 'type': 'date', 'value': {
+            'start_date': start_date, 'repetition': True, 'repetition_type': 'daily', 'repetition_config': {'interval': 1}
+        }}
+    }}).get_json()['page_id']
+
+
+def test_task_starting_later_gets_stats_once_due(app_module, client):
+    start = date.today() + timedelta(days=3)
+    page_id = _create_daily_task(client, start.isoformat())
+    assert app_module.load_task_stats([page_id]) == {}
+
+    as_of = (start + timedelta(days=5)).isoformat()
+    stats = app_module.load_task_stats([page_id], as_of=as_of)[page_id]
+    assert (stats['expected_count'], stats['completed_count'], stats['pending']) == (6, 0, 1)
+
+    assert _recompute(app_module, page_id, as_of) == stats
+
+
+def test_stale_rows_roll_forward_like_a_recompute(app_module, client):
+    start = date.today() - timedelta(days=4)
+    page_id = _create_daily_task(client, start.isoformat())
+    client.post('/api/mark_completed', json={'page_id': page_id, 'date': start.isoformat(), 'completed': True})
+
+    as_of = (date.today() + timedelta(days=10)).isoformat()
+    rolled = app_module.load_task_stats([page_id], as_of=as_of)[page_id]
+    assert rolled == _recompute(app_module, page_id, as_of)
+    assert (rolled['expected_count'], rolled['completed_count']) == (15, 1)